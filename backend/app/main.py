@@ -1,81 +1,145 @@
 """
 FastAPI主应用
 """
-import sys
-from pathlib import Path
+import asyncio
+from contextlib import asynccontextmanager
 
-# 添加项目根目录到Python路径
-# 在Docker中：/app/backend/app/main.py -> /app (向上3级)
-# 在本地：backend/app/main.py -> 项目根目录 (向上3级)
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
 
 from shared.config import settings
-from shared.database import init_db
+from shared.database import ensure_compat_indexes, init_db
 from shared.utils import get_logger
-from .routers import reports, subscriptions, health, auth, admin, werss
+from .middleware import FastCORS, StaticDispatch
+from .routers import admin, auth, health, reports, subscriptions, werss
+
+# 根路径返回固定内容，导入时序列化一次
+_ROOT_BODY = orjson.dumps({
+    "name": "Z-Pulse API Backend",
+    "version": "2.0.0",
+    "status": "running"
+})
+
+
+async def _root_asgi(scope, receive, send) -> None:
+    """
+    根路径（GET / 只由 StaticDispatch 直达，不再注册为路由）
+
+    Response 带有请求级状态，每次新建，只复用序列化好的 body
+    """
+    await Response(content=_ROOT_BODY, media_type="application/json")(scope, receive, send)
+
+
+def _cache_openapi(app: FastAPI) -> None:
+    """启动时生成 OpenAPI schema 并缓存序列化结果，替换默认的 /openapi.json 路由"""
+    if not app.openapi_url:
+        return
+    openapi_body = orjson.dumps(app.openapi())
+
+    async def openapi(request: Request) -> Response:
+        return Response(content=openapi_body, media_type="application/json")
+
+    app.router.routes[:] = [
+        route for route in app.router.routes
+        if getattr(route, "path", None) != app.openapi_url
+    ]
+    app.add_route(app.openapi_url, openapi, include_in_schema=False)
+
+
+# 关闭时等待后台补索引的最长秒数
+_INDEX_TASK_SHUTDOWN_WAIT = 10.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时初始化数据库，关闭时记录日志"""
+    # 在此处才配置 logger（会创建日志目录和文件 handler），导入模块时不产生副作用
+    logger = get_logger("api-backend")
+    logger.info("Starting API backend...")
+    _cache_openapi(app)
+    # init_db 是同步的（create_all + 反射），放到线程里执行，避免阻塞事件循环
+    await asyncio.to_thread(init_db, build_indexes=False)
+    logger.info("Database initialized")
+    # 补索引（首次部署时可能要建很久）在后台线程执行，服务和 /health 立即可用；
+    # 多个 worker 同时启动时由 advisory lock 保证只有一个真正执行
+    index_task = asyncio.create_task(asyncio.to_thread(ensure_compat_indexes))
+    # 邮件配置进程内不变：启动时检查一次并缓存，订阅请求直接读缓存结果
+    from .services.email_service import email_config_status
+    email_ok, email_reason = email_config_status()
+    if not email_ok:
+        logger.warning(f"Email service not configured: {email_reason}")
+    yield
+    logger.info("Shutting down API backend...")
+    # 等待补索引结束（收集异常）；超时则放弃等待，被中断的构建会在下次启动时清理重建
+    try:
+        await asyncio.wait_for(index_task, timeout=_INDEX_TASK_SHUTDOWN_WAIT)
+    except asyncio.TimeoutError:
+        logger.warning("Compat index build still running at shutdown, abandoned")
+    except Exception as e:
+        logger.warning(f"Compat index build failed: {e}")
+    if settings.ENABLE_ADMIN_API:
+        await admin.close_werss_http_session()
 
-logger = get_logger("api-backend")
 
 app = FastAPI(
     title="Z-Pulse API Backend",
     description="财政信息AI日报系统 API",
     version="2.0.0",
-    docs_url="/docs",
-    openapi_url="/openapi.json",
+    # 生产环境不暴露文档，避免为每个路由构建 OpenAPI schema
+    docs_url="/docs" if settings.DEBUG else None,
+    redoc_url=None,
+    openapi_url="/openapi.json" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# CORS配置
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # 生产环境应该限制具体域名
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# 注册路由
-app.include_router(health.router, tags=["健康检查"])
+# 注册路由。Starlette 按注册顺序逐个匹配：健康检查（纯 Starlette Route，GET 由 StaticDispatch 直达）
+# 和公开的高频接口在前，路由最多的管理后台放最后
+app.router.routes.insert(0, health.route)
 app.include_router(reports.router, prefix="/api/reports", tags=["报告"])
 app.include_router(subscriptions.router, prefix="/api/subscribe", tags=["订阅"])
-app.include_router(auth.router, prefix="/api/auth", tags=["认证"])
-app.include_router(admin.router, prefix="/api/admin", tags=["管理后台"])
 app.include_router(werss.router, tags=["WeRSS"])
+app.include_router(auth.router, prefix="/api/auth", tags=["认证"])
+if settings.ENABLE_ADMIN_API:
+    app.include_router(admin.router, prefix="/api/admin", tags=["管理后台"])
 
+# 根路径与健康检查是最高频的静态请求，精确匹配后直接响应
+app.add_middleware(StaticDispatch, table={
+    ("GET", "/"): _root_asgi,
+    ("GET", "/health"): health.route.app,
+})
 
-@app.on_event("startup")
-async def startup_event():
-    """启动事件"""
-    logger.info("Starting API backend...")
-    init_db()
-    logger.info("Database initialized")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """关闭事件"""
-    logger.info("Shutting down API backend...")
-
-
-@app.get("/")
-async def root():
-    """根路径"""
-    return {
-        "name": "Z-Pulse API Backend",
-        "version": "2.0.0",
-        "status": "running"
-    }
+# CORS配置
+# 前端通过 Bearer token 鉴权，不依赖 cookie，因此无需 allow_credentials
+app.add_middleware(FastCORS)
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
+    import os
 
+    import uvicorn
+    # uvicorn[standard] 已包含 uvloop/httptools；本服务不提供 websocket
+    if settings.DEBUG:
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            loop="uvloop",
+            http="httptools",
+            ws="none",
+        )
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=settings.API_WORKERS or (os.cpu_count() or 1) * 2 + 1,
+            backlog=settings.API_BACKLOG,
+            limit_concurrency=settings.API_LIMIT_CONCURRENCY,
+            timeout_keep_alive=settings.API_TIMEOUT_KEEP_ALIVE,
+            loop="uvloop",
+            http="httptools",
+            ws="none",
+        )
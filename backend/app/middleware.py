@@ -0,0 +1,89 @@
+"""
+ASGI中间件
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class FastCORS:
+    """
+    轻量 CORS 中间件（纯 ASGI）
+
+    - 所有响应头在初始化时预先编码为 bytes，请求路径上不再拼接字符串
+    - 非 HTTP 或不带 Origin 的请求直接透传
+    - 预检请求（OPTIONS + Access-Control-Request-Method）直接返回 204
+    - 前端不使用 cookie 凭证，因此不下发 Allow-Credentials，允许任意来源
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_methods: Iterable[str] = ("GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"),
+        max_age: int = 86400,
+    ) -> None:
+        self.app = app
+        self._allow_origin: Tuple[bytes, bytes] = (b"access-control-allow-origin", b"*")
+        self._preflight_headers: List[Tuple[bytes, bytes]] = [
+            self._allow_origin,
+            (b"access-control-allow-methods", ",".join(allow_methods).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"content-length", b"0"),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_headers = None
+        for key, value in scope["headers"]:
+            if key == b"origin":
+                origin = value
+            elif key == b"access-control-request-headers":
+                request_headers = value
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and any(
+            key == b"access-control-request-method" for key, _ in scope["headers"]
+        ):
+            headers = list(self._preflight_headers)
+            if request_headers:
+                # "*" 不覆盖 Authorization，按请求回显所需请求头
+                headers.append((b"access-control-allow-headers", request_headers))
+            await send({"type": "http.response.start", "status": 204, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        allow_origin = self._allow_origin
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [allow_origin]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+class StaticDispatch:
+    """
+    静态路由直达
+
+    (method, path) 精确命中时直接调用对应的 ASGI 应用，跳过路由表的逐个正则匹配；
+    未命中的请求原样交给下游
+    """
+
+    def __init__(self, app: ASGIApp, table: Dict[Tuple[str, str], ASGIApp]) -> None:
+        self.app = app
+        self.table = table
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            endpoint = self.table.get((scope["method"], scope["path"]))
+            if endpoint is not None:
+                await endpoint(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
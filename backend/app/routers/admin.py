@@ -5,22 +5,28 @@ from datetime import datetime, timedelta, timezone, date
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response, BackgroundTasks
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
+import asyncio
 import time
 import re
 import html as _html
-import httpx
+import aiohttp
+import orjson
 from urllib.parse import urlencode
 import os
 import threading
+import csv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, text
-from pydantic import BaseModel, EmailStr
-import pandas as pd
+from sqlalchemy import delete, desc, func, select, text, true, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import BaseModel, ConfigDict, EmailStr
 import io
 
 from shared.database import (
     get_db,
+    engine,
     SessionLocal,
     OfficialAccount,
     Article,
@@ -41,25 +47,62 @@ from shared.utils import get_logger
 
 router = APIRouter(tags=["管理后台"])
 logger = get_logger("api.admin")
+# 进程内快速判断；跨 worker 的互斥依赖下面的 Postgres advisory lock
 _ARTICLE_COLLECT_LOCK = threading.Lock()
+_ARTICLE_COLLECT_ADVISORY_KEY = 0xC011EC701
 
 
+_UTC = timezone.utc
+_ARTICLE_STATUS_BY_VALUE = {s.value: s for s in ArticleStatus}
+
 _WERSS_TOKEN_CACHE: dict[str, Any] = {"token": None, "exp_ts": 0.0}
+_WERSS_TOKEN_LOCK = asyncio.Lock()
+# 文章列表总数超过该行数时改用估算值
+_APPROX_COUNT_MIN_ROWS = 50_000
+# 大列表接口的服务端游标批量大小（yield_per）
+_LIST_FETCH_SIZE = 200
+# 文章详情按需回源抓全文的重试间隔（weRSS 返回的仍是短文本时不再每次都抓）
+_FULLTEXT_REFETCH_TTL = timedelta(days=7)
+# 复用同一个 HTTP 会话（连接池 + keep-alive），避免每次请求重新建连
+_WERSS_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
 
 
 def _iso_utc(dt: datetime | None) -> str:
     """Return ISO string with explicit UTC timezone (+00:00)."""
     if not dt:
         return ""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=_UTC).isoformat()
+    return dt.astimezone(_UTC).isoformat()
+
+
+def _orjson_response(content: Any, option: int = 0, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    列表接口直接用 orjson 编码返回，跳过 response_model 的逐行校验和 jsonable_encoder
+    （response_model 仍保留在路由上，仅用于 OpenAPI 文档）
+    """
+    return Response(content=orjson.dumps(content, option=option), media_type="application/json", headers=headers)
+
+# list_articles 的 date 参数与 datetime.date 同名，这里先取出解析函数
+_parse_iso_date = date.fromisoformat
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"[ \t]+")
+_BLANK_RE = re.compile(r"\n{3,}")
+# standalone wechat image placeholders
+_PLACEHOLDER_TOKENS = frozenset({"图片", "image", "Image"})
+
+def _approx_row_count(db: Session, table_name: str) -> Optional[int]:
+    """Planner row estimate from pg_class.reltuples; None if unavailable (e.g. never analyzed)."""
     try:
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        else:
-            dt = dt.astimezone(timezone.utc)
-        return dt.isoformat()
+        n = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :t"),
+            {"t": table_name},
+        ).scalar()
     except Exception:
-        # fallback: best-effort
-        return str(dt)
+        db.rollback()
+        return None
+    return int(n) if n is not None and n >= 0 else None
 
 def _looks_like_placeholder_text(s: str) -> bool:
     if not isinstance(s, str):
@@ -70,10 +113,29 @@ def _looks_like_placeholder_text(s: str) -> bool:
     # common wechat/rss placeholder texts
     if "欢迎关注" in t and len(t) < 80:
         return True
-    if t in ("图片", "image", "Image"):
+    if t in _PLACEHOLDER_TOKENS:
         return True
     return len(t) < 120
 
+try:
+    # selectolax (Lexbor) parses + extracts text several times faster than lxml
+    from selectolax.lexbor import LexborHTMLParser
+
+    def _html_to_text(s: str) -> str:
+        tree = LexborHTMLParser(s)
+        for bad in tree.css("script, style, noscript"):
+            bad.decompose()
+        node = tree.body or tree.root
+        # 不插入分隔符，与 lxml text_content() 的结果保持一致（避免把行内 span 拆行）
+        return node.text() if node is not None else ""
+except ImportError:
+    def _html_to_text(s: str) -> str:
+        from lxml import html as lxml_html
+        doc = lxml_html.fromstring(s)
+        for bad in doc.xpath("//script|//style|//noscript"):
+            bad.drop_tree()
+        return doc.text_content()
+
 def _to_visible_text(raw: str) -> str:
     """Convert HTML-ish content to user-visible plain text."""
     if not raw:
@@ -85,52 +147,78 @@ def _to_visible_text(raw: str) -> str:
         pass
     if "<" in s and ">" in s:
         try:
-            from lxml import html as lxml_html
-            doc = lxml_html.fromstring(s)
-            for bad in doc.xpath("//script|//style|//noscript"):
-                bad.drop_tree()
-            s = doc.text_content()
+            s = _html_to_text(s)
         except Exception:
-            s = re.sub(r"<[^>]+>", " ", s)
+            s = _TAG_RE.sub(" ", s)
     s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = re.sub(r"[ \t]+", " ", s)
+    s = _WS_RE.sub(" ", s)
     lines = []
     for line in s.split("\n"):
         t = line.strip()
         if not t:
             continue
-        if t in ("图片", "image", "Image"):
+        if t in _PLACEHOLDER_TOKENS:
             continue
         lines.append(t)
     s = "\n".join(lines)
-    s = re.sub(r"\n{3,}", "\n\n", s).strip()
+    s = _BLANK_RE.sub("\n\n", s).strip()
     return s
 
+def _get_werss_http_session() -> aiohttp.ClientSession:
+    """Lazily build the shared weRSS HTTP session (must be called from a running event loop)."""
+    global _WERSS_HTTP_SESSION
+    if _WERSS_HTTP_SESSION is None or _WERSS_HTTP_SESSION.closed:
+        _WERSS_HTTP_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=40),
+            connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300),
+        )
+    return _WERSS_HTTP_SESSION
+
+
+async def close_werss_http_session() -> None:
+    """Close the shared weRSS HTTP session (called on app shutdown)."""
+    global _WERSS_HTTP_SESSION
+    if _WERSS_HTTP_SESSION is not None:
+        await _WERSS_HTTP_SESSION.close()
+        _WERSS_HTTP_SESSION = None
+
+
+def _cached_werss_token() -> Optional[str]:
+    if _WERSS_TOKEN_CACHE.get("token") and float(_WERSS_TOKEN_CACHE.get("exp_ts") or 0) > time.time() + 30:
+        return _WERSS_TOKEN_CACHE["token"]
+    return None
+
+
 async def _get_werss_token(base_url: str) -> Optional[str]:
     """Login to weRSS and cache a short-lived token for internal fetches."""
-    now = time.time()
-    if _WERSS_TOKEN_CACHE.get("token") and float(_WERSS_TOKEN_CACHE.get("exp_ts") or 0) > now + 30:
-        return _WERSS_TOKEN_CACHE["token"]
-    username = os.getenv("WERSS_ADMIN_USERNAME") or "admin"
-    password = os.getenv("WERSS_ADMIN_PASSWORD") or "admin@123"
-    try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.post(
+    token = _cached_werss_token()
+    if token:
+        return token
+    # single-flight：token 过期时并发请求只发起一次登录，其余等锁后直接读缓存
+    async with _WERSS_TOKEN_LOCK:
+        token = _cached_werss_token()
+        if token:
+            return token
+        username = os.getenv("WERSS_ADMIN_USERNAME") or "admin"
+        password = os.getenv("WERSS_ADMIN_PASSWORD") or "admin@123"
+        try:
+            session = _get_werss_http_session()
+            async with session.post(
                 f"{base_url}/api/v1/wx/auth/login",
                 data={"username": username, "password": password},
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            resp.raise_for_status()
-            data = resp.json()
+                timeout=aiohttp.ClientTimeout(total=20),
+            ) as resp:
+                resp.raise_for_status()
+                data = await resp.json(content_type=None)
             token = (data.get("data") or {}).get("access_token")
             if token:
                 # token expiry is managed by weRSS; cache for 30 minutes conservatively
                 _WERSS_TOKEN_CACHE["token"] = token
-                _WERSS_TOKEN_CACHE["exp_ts"] = now + 30 * 60
+                _WERSS_TOKEN_CACHE["exp_ts"] = time.time() + 30 * 60
             return token
-    except Exception as e:
-        logger.warning(f"Failed to login to weRSS for fulltext fetch: {e}")
-        return None
+        except Exception as e:
+            logger.warning(f"Failed to login to weRSS for fulltext fetch: {e}")
+            return None
 
 async def _fetch_fulltext_from_werss(article_url: str) -> Optional[str]:
     """
@@ -142,16 +230,16 @@ async def _fetch_fulltext_from_werss(article_url: str) -> Optional[str]:
     if not token:
         return None
     try:
-        async with httpx.AsyncClient(timeout=40) as client:
-            # this endpoint is POST with query param 'url'
-            url = f"{base_url}/api/v1/wx/mps/by_article?{urlencode({'url': article_url})}"
-            resp = await client.post(url, headers={"Authorization": f"Bearer {token}"})
+        session = _get_werss_http_session()
+        # this endpoint is POST with query param 'url'
+        url = f"{base_url}/api/v1/wx/mps/by_article?{urlencode({'url': article_url})}"
+        async with session.post(url, headers={"Authorization": f"Bearer {token}"}) as resp:
             resp.raise_for_status()
-            payload = resp.json()
-            info = payload.get("data") or {}
-            raw = info.get("content") or ""
-            txt = _to_visible_text(raw)
-            return txt or None
+            payload = await resp.json(content_type=None)
+        info = payload.get("data") or {}
+        raw = info.get("content") or ""
+        txt = _to_visible_text(raw)
+        return txt or None
     except Exception as e:
         logger.warning(f"Failed to fetch fulltext from weRSS: {e}")
         return None
@@ -186,8 +274,7 @@ class OfficialAccountResponse(BaseModel):
     last_collection_time: datetime | None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 @router.get("/accounts/export")
@@ -221,33 +308,39 @@ async def export_accounts(
             }
         )
     
-    # 导出实际数据
-    accounts = db.query(OfficialAccount).all()
-    
-    # 构建DataFrame（导出时按新顺序：werss_feed_id, name, is_active, wechat_id，is_active 使用 0/1 格式）
-    data = []
-    for account in accounts:
-        data.append({
-            'werss_feed_id': account.werss_feed_id or '',
-            'name': account.name,
-            'is_active': 1 if account.is_active else 0,  # 导出时使用 0/1 格式
-            'wechat_id': account.wechat_id or '',
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # 确保列顺序：werss_feed_id, name, is_active, wechat_id
-    column_order = ['werss_feed_id', 'name', 'is_active', 'wechat_id']
-    df = df[column_order]
-    
-    # 转换为CSV
-    output = io.StringIO()
-    df.to_csv(output, index=False, encoding='utf-8-sig')
-    output.seek(0)
-    
-    return Response(
-        content=output.getvalue(),
-        media_type='text/csv',
+    # 导出实际数据：服务端游标分批读取，逐行写出，不在内存中拼出完整文件
+    # 列顺序：werss_feed_id, name, is_active, wechat_id，is_active 使用 0/1 格式
+    def _iter_rows():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        buf.write('\ufeff')  # UTF-8 BOM，方便 Excel 识别编码
+        writer.writerow(['werss_feed_id', 'name', 'is_active', 'wechat_id'])
+        # 依赖注入的会话在响应开始前就会关闭，流式导出使用独立会话
+        s = SessionLocal()
+        try:
+            accounts = (
+                s.query(OfficialAccount)
+                .execution_options(stream_results=True)
+                .yield_per(1000)
+            )
+            for account in accounts:
+                writer.writerow([
+                    account.werss_feed_id or '',
+                    account.name,
+                    1 if account.is_active else 0,
+                    account.wechat_id or '',
+                ])
+                if buf.tell() >= 64 * 1024:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+        finally:
+            s.close()
+        yield buf.getvalue()
+
+    return StreamingResponse(
+        _iter_rows(),
+        media_type='text/csv; charset=utf-8',
         headers={
             'Content-Disposition': 'attachment; filename="accounts_export.csv"'
         }
@@ -263,6 +356,8 @@ async def list_accounts(
     current_user: User = Depends(get_current_active_user),
 ):
     """获取公众号列表"""
+    # total_articles / last_collection_time 是 official_accounts 上的冗余列（由采集 worker 维护），
+    # 单表查询即可，无需逐个账号统计文章
     query = db.query(OfficialAccount)
     
     if is_active is not None:
@@ -300,12 +395,15 @@ async def create_account(
     )
     
     db.add(account)
+    # 默认值都在 Python 侧生成，flush 后 id 由 INSERT ... RETURNING 回填；
+    # 在 commit 之前生成响应，避免 commit 过期属性后序列化再 SELECT 一次
+    db.flush()
+    result = OfficialAccountResponse.model_validate(account)
     db.commit()
-    db.refresh(account)
     
-    logger.info(f"Account created: {account.name} by {current_user.username}")
+    logger.info(f"Account created: {result.name} by {current_user.username}")
     
-    return account
+    return result
 
 
 @router.get("/accounts/{account_id}", response_model=OfficialAccountResponse)
@@ -346,12 +444,13 @@ async def update_account(
     for field, value in update_data.items():
         setattr(account, field, value)
     
+    # 内存中已是更新后的状态，commit 前生成响应，无需 refresh
+    result = OfficialAccountResponse.model_validate(account)
     db.commit()
-    db.refresh(account)
     
-    logger.info(f"Account updated: {account.name} by {current_user.username}")
+    logger.info(f"Account updated: {result.name} by {current_user.username}")
     
-    return account
+    return result
 
 
 @router.delete("/accounts/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -361,17 +460,29 @@ async def delete_account(
     current_user: User = Depends(get_current_active_user),
 ):
     """删除公众号"""
-    account = db.query(OfficialAccount).filter(OfficialAccount.id == account_id).first()
-    if not account:
+    # 直接 DELETE ... RETURNING：文章由外键 ON DELETE CASCADE 在库内删除，
+    # 不再经 ORM 级联把该号的全部文章加载进来逐条删除
+    name = db.execute(
+        delete(OfficialAccount).where(OfficialAccount.id == account_id).returning(OfficialAccount.name)
+    ).scalar_one_or_none()
+    if name is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found"
         )
     
-    db.delete(account)
     db.commit()
     
-    logger.info(f"Account deleted: {account.name} by {current_user.username}")
+    logger.info(f"Account deleted: {name} by {current_user.username}")
+
+
+def _cell_str(value: Any) -> str:
+    """Excel 单元格值转为去空白的字符串（整数值的浮点数按整数处理，如 1.0 -> "1"）"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
 
 
 @router.post("/accounts/import")
@@ -395,106 +506,91 @@ async def import_accounts(
         file_ext = file.filename.split('.')[-1].lower() if file.filename else 'csv'
         
         if file_ext in ['xlsx', 'xls']:
-            # Excel文件
-            df = pd.read_excel(io.BytesIO(contents))
+            # Excel文件（openpyxl 只读模式，按需导入）
+            from openpyxl import load_workbook
+            wb = load_workbook(io.BytesIO(contents), read_only=True, data_only=True)
+            table = [[_cell_str(c) for c in row] for row in wb.active.iter_rows(values_only=True)]
+            wb.close()
         else:
-            # CSV文件 - 尝试读取，如果第一行是说明行则跳过
-            try:
-                # 先读取第一行检查是否是说明行
-                first_line = contents.split(b'\n')[0].decode('utf-8', errors='ignore')
-                # 检查是否包含说明关键词
-                if '说明' in first_line or '第一行是说明' in first_line or '导入前请删除' in first_line or '请务必' in first_line:
-                    # 跳过说明行（第一行），从第二行开始读取（第二行应该是列名）
-                    df = pd.read_csv(io.BytesIO(contents), encoding='utf-8', skiprows=1)
-                    logger.info("检测到说明行，已自动跳过第一行")
-                else:
-                    # 没有说明行，正常读取
-                    df = pd.read_csv(io.BytesIO(contents), encoding='utf-8')
-            except Exception as e:
-                # 如果出错，尝试正常读取
-                logger.warning(f"CSV解析出错，尝试正常读取: {str(e)}")
-                df = pd.read_csv(io.BytesIO(contents), encoding='utf-8')
+            # CSV文件（utf-8-sig 兼容导出文件中的 BOM）
+            text_content = contents.decode('utf-8-sig', errors='replace')
+            table = [[c.strip() for c in row] for row in csv.reader(io.StringIO(text_content))]
+
+        # 跳过空行；如果第一行是说明行则跳过（第二行应该是列名）
+        table = [row for row in table if any(row)]
+        if table and any(
+            kw in ','.join(table[0])
+            for kw in ('说明', '第一行是说明', '导入前请删除', '请务必')
+        ):
+            table = table[1:]
+            logger.info("检测到说明行，已自动跳过第一行")
+        if not table:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="文件为空"
+            )
+
+        header, data_rows = table[0], table[1:]
         
         # 验证必需列（所有字段都是必填的）
         required_columns = ['werss_feed_id', 'name', 'is_active', 'wechat_id']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in required_columns if col not in header]
         if missing_columns:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"缺少必需列: {', '.join(missing_columns)}。请确保CSV文件包含所有列：werss_feed_id, name, is_active, wechat_id"
             )
+        col_idx = [header.index(col) for col in required_columns]
         
-        # 处理数据
-        success_count = 0
-        error_count = 0
+        # 处理数据：先逐行校验（纯 Python，无 DataFrame），再一次性查重、批量插入
         errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                # 获取数据，所有字段都是必填的（按新顺序：werss_feed_id, name, is_active, wechat_id）
-                werss_feed_id = str(row['werss_feed_id']).strip() if pd.notna(row.get('werss_feed_id')) else None
-                if not werss_feed_id:
-                    errors.append(f"第{index+2}行: Feed ID为空（必填）")
-                    error_count += 1
-                    continue
-                
-                name = str(row['name']).strip()
-                if not name:
-                    errors.append(f"第{index+2}行: 名称为空（必填）")
-                    error_count += 1
-                    continue
-                
-                # is_active 字段处理（只接受 0 或 1）
-                is_active_raw = row.get('is_active')
-                if pd.isna(is_active_raw):
-                    errors.append(f"第{index+2}行: is_active为空（必填，填写1表示启用，0表示停用）")
-                    error_count += 1
-                    continue
-                
-                # 转换为字符串并去除空格
-                is_active_str = str(is_active_raw).strip()
-                if is_active_str == '1':
-                    is_active = True
-                elif is_active_str == '0':
-                    is_active = False
-                else:
-                    errors.append(f"第{index+2}行: is_active值无效（必须是0或1，1表示启用，0表示停用）")
-                    error_count += 1
-                    continue
-                
-                wechat_id = str(row['wechat_id']).strip() if pd.notna(row.get('wechat_id')) else None
-                if not wechat_id:
-                    errors.append(f"第{index+2}行: 微信ID为空（必填）")
-                    error_count += 1
-                    continue
-                
-                # 检查是否已存在（通过wechat_id或name）
-                if wechat_id:
-                    existing = db.query(OfficialAccount).filter(
-                        OfficialAccount.wechat_id == wechat_id
-                    ).first()
-                    if existing:
-                        errors.append(f"第{index+2}行: 微信ID {wechat_id} 已存在")
-                        error_count += 1
-                        continue
-                
-                # 创建公众号（所有字段都已验证为必填）
-                account = OfficialAccount(
-                    name=name,
-                    wechat_id=wechat_id,
-                    werss_feed_id=werss_feed_id,
-                    werss_sync_method='rss',
-                    is_active=is_active,
-                )
-                
-                db.add(account)
-                success_count += 1
-                
-            except Exception as e:
-                errors.append(f"第{index+2}行: {str(e)}")
-                error_count += 1
+        candidates = []
+        for line_no, row in enumerate(data_rows, start=2):
+            werss_feed_id, name, is_active, wechat_id = (
+                row[i] if i < len(row) else '' for i in col_idx
+            )
+            if not werss_feed_id:
+                errors.append((line_no, "Feed ID为空（必填）"))
+            elif not name:
+                errors.append((line_no, "名称为空（必填）"))
+            elif not is_active:
+                errors.append((line_no, "is_active为空（必填，填写1表示启用，0表示停用）"))
+            elif is_active not in ('1', '0'):
+                errors.append((line_no, "is_active值无效（必须是0或1，1表示启用，0表示停用）"))
+            elif not wechat_id:
+                errors.append((line_no, "微信ID为空（必填）"))
+            else:
+                candidates.append((line_no, werss_feed_id, name, is_active == '1', wechat_id))
+
+        # 检查是否已存在（一次查询取回所有冲突的 wechat_id；文件内重复的也视为已存在）
+        existing = set()
+        if candidates:
+            existing = {
+                r[0] for r in db.query(OfficialAccount.wechat_id)
+                .filter(OfficialAccount.wechat_id.in_(list({c[4] for c in candidates})))
+                .all()
+            }
+        mappings = []
+        for line_no, werss_feed_id, name, is_active, wechat_id in candidates:
+            if wechat_id in existing:
+                errors.append((line_no, f"微信ID {wechat_id} 已存在"))
                 continue
-        
+            existing.add(wechat_id)
+            mappings.append({
+                'name': name,
+                'wechat_id': wechat_id,
+                'werss_feed_id': werss_feed_id,
+                'werss_sync_method': 'rss',
+                'is_active': is_active,
+            })
+
+        # 一次性批量插入
+        if mappings:
+            db.bulk_insert_mappings(OfficialAccount, mappings)
+        success_count = len(mappings)
+        error_count = len(errors)
+        errors = [f"第{line_no}行: {message}" for line_no, message in sorted(errors)]
+
         # 提交所有更改
         db.commit()
         
@@ -508,11 +604,8 @@ async def import_accounts(
             "message": f"成功导入 {success_count} 个公众号，失败 {error_count} 个"
         }
         
-    except pd.errors.EmptyDataError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="文件为空"
-        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Import error: {str(e)}")
         raise HTTPException(
@@ -536,8 +629,7 @@ class SubscriberResponse(BaseModel):
     created_at: datetime
     activated_at: datetime | None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 @router.get("/subscribers", response_model=List[SubscriberResponse])
@@ -581,17 +673,18 @@ async def delete_subscriber(
     current_user: User = Depends(get_current_active_user),
 ):
     """删除订阅者"""
-    subscriber = db.query(Subscriber).filter(Subscriber.id == subscriber_id).first()
-    if not subscriber:
+    email = db.execute(
+        delete(Subscriber).where(Subscriber.id == subscriber_id).returning(Subscriber.email)
+    ).scalar_one_or_none()
+    if email is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Subscriber not found"
         )
     
-    db.delete(subscriber)
     db.commit()
     
-    logger.info(f"Subscriber deleted: {subscriber.email} by {current_user.username}")
+    logger.info(f"Subscriber deleted: {email} by {current_user.username}")
 
 
 # ==================== 文章管理 ====================
@@ -608,13 +701,11 @@ class ArticleResponse(BaseModel):
     status: str
     collected_at: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 @router.get("/articles", response_model=List[ArticleResponse])
 async def list_articles(
-    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
@@ -625,56 +716,89 @@ async def list_articles(
 ):
     """获取文章列表（管理后台）"""
     # Join to avoid N+1 queries for account name (this endpoint is used by admin UI).
-    query = db.query(Article, OfficialAccount.name).join(
+    # Select only the columns the list needs: content is cut to an 800-char preview in SQL
+    # (full text is available via /articles/{id}).
+    query = db.query(
+        Article.id,
+        Article.account_id,
+        OfficialAccount.name.label("account_name"),
+        Article.title,
+        func.substr(Article.content, 1, 800).label("preview"),
+        Article.article_url,
+        Article.published_at,
+        Article.status,
+        Article.collected_at,
+    ).join(
         OfficialAccount, OfficialAccount.id == Article.account_id
     )
     
     if status:
-        query = query.filter(Article.status == ArticleStatus(status))
+        status_enum = _ARTICLE_STATUS_BY_VALUE.get(status)
+        if status_enum is None:
+            raise HTTPException(status_code=422, detail=f"Invalid status: {status}")
+        query = query.filter(Article.status == status_enum)
     
     if date:
+        # 非法日期直接报错，不再静默退化成不带日期的全表结果
         try:
-            target_date = datetime.strptime(date, '%Y-%m-%d').date()
-            tomorrow = target_date + timedelta(days=1)
-            query = query.filter(
-                Article.published_at >= target_date,
-                Article.published_at < tomorrow
-            )
+            target_date = _parse_iso_date(date)
         except ValueError:
-            pass
+            raise HTTPException(status_code=422, detail=f"Invalid date: {date}")
+        tomorrow = target_date + timedelta(days=1)
+        # 半开区间，可走 published_at 索引做范围扫描
+        query = query.filter(
+            Article.published_at >= target_date,
+            Article.published_at < tomorrow
+        )
     
     if search:
+        # title/content 上有 pg_trgm GIN 索引，关键词 >= 3 个字符时 ILIKE 可走索引
         search_pattern = f"%{search}%"
         query = query.filter(
             (Article.title.ilike(search_pattern)) |
             (Article.content.ilike(search_pattern))
         )
     
-    total = query.count()
-    response.headers["X-Total-Count"] = str(total)
+    # 无筛选条件且表很大时，总数用 pg_class 的估算值（分页只需要大致总数），
+    # 查询也不带窗口计数，LIMIT 可以直接沿 published_at 索引取前几行；
+    # 其余情况总数作为 count() OVER () 窗口列随分页查询一起返回
+    approx_total = None
+    if not (status or date or search):
+        estimate = _approx_row_count(db, Article.__tablename__)
+        if estimate is not None and estimate >= _APPROX_COUNT_MIN_ROWS:
+            approx_total = estimate
+    if approx_total is None:
+        query = query.add_columns(func.count().over().label("total"))
 
     rows = query.order_by(desc(Article.published_at)).offset(skip).limit(limit).all()
-    
+    if approx_total is not None:
+        total = approx_total
+    elif rows:
+        total = rows[0].total
+    else:
+        # 页码越界时窗口计数拿不到，单独查一次
+        total = query.count() if skip else 0
     # 构建响应，包含公众号名称
-    result = []
-    for article, account_name in rows:
-        # list page should be fast: only send a short preview; full text is available via /articles/{id}
-        preview = article.content
-        if isinstance(preview, str) and len(preview) > 800:
-            preview = preview[:800]
-        result.append(ArticleResponse(
-            id=article.id,
-            account_id=article.account_id,
-            account_name=account_name,
-            title=article.title,
-            content=preview,
-            article_url=article.article_url,
-            published_at=_iso_utc(article.published_at),
-            status=article.status.value if hasattr(article.status, 'value') else str(article.status),
-            collected_at=_iso_utc(article.collected_at),
-        ))
-    
-    return result
+    # 时间列库里存的是 naive UTC，OPT_NAIVE_UTC 输出与 _iso_utc 相同的 "+00:00" 格式
+    # 直接返回 Response 时注入的 response 头不会合并，总数头写在这里
+    return _orjson_response(
+        [
+            {
+                "id": row.id,
+                "account_id": row.account_id,
+                "account_name": row.account_name,
+                "title": row.title,
+                "content": row.preview,
+                "article_url": row.article_url,
+                "published_at": row.published_at or "",
+                "status": row.status.value,
+                "collected_at": row.collected_at or "",
+            }
+            for row in rows
+        ],
+        option=orjson.OPT_NAIVE_UTC,
+        headers={"X-Total-Count": str(total)},
+    )
 
 
 @router.get("/articles/{article_id}", response_model=ArticleResponse)
@@ -694,12 +818,21 @@ async def get_article(
         raise HTTPException(status_code=404, detail="Article not found")
     article, account_name = row
     # If stored content is clearly a placeholder/summary, try fetching full text from weRSS on-demand.
-    if _looks_like_placeholder_text(article.content or "") and article.article_url:
+    # Each article is re-fetched at most once per TTL, whether the last attempt succeeded or not.
+    if (
+        _looks_like_placeholder_text(article.content or "")
+        and article.article_url
+        and (
+            not article.fulltext_fetched_at
+            or article.fulltext_fetched_at < datetime.utcnow() - _FULLTEXT_REFETCH_TTL
+        )
+    ):
         fulltext = await _fetch_fulltext_from_werss(article.article_url)
         if fulltext and len(fulltext) > len((article.content or "").strip()) + 80:
             article.content = fulltext
-            db.add(article)
-            db.commit()
+        article.fulltext_fetched_at = datetime.utcnow()
+        db.add(article)
+        db.commit()
     return ArticleResponse(
         id=article.id,
         account_id=article.account_id,
@@ -708,7 +841,7 @@ async def get_article(
         content=article.content,
         article_url=article.article_url,
         published_at=_iso_utc(article.published_at),
-        status=article.status.value if hasattr(article.status, 'value') else str(article.status),
+        status=article.status.value,
         collected_at=_iso_utc(article.collected_at),
     )
 
@@ -728,7 +861,17 @@ async def trigger_article_collection(
         logger.info(f"Article collection triggered by {current_user.username}")
 
         # Prevent stacking multiple collections if user clicks repeatedly.
-        if _ARTICLE_COLLECT_LOCK.locked():
+        # 先查进程内锁，再用 advisory lock 探测其他 worker 是否正在采集
+        already_running = _ARTICLE_COLLECT_LOCK.locked()
+        if not already_running:
+            (locked,) = db.execute(
+                text("SELECT pg_try_advisory_lock(:k)"), {"k": _ARTICLE_COLLECT_ADVISORY_KEY}
+            ).first()
+            if locked:
+                # 会话级锁绑定在连接上，请求连接会归还连接池，真正的持锁放在后台任务里
+                db.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _ARTICLE_COLLECT_ADVISORY_KEY})
+            already_running = not locked
+        if already_running:
             return {
                 "status": "accepted",
                 "message": "已有采集任务在运行中（不会重复启动）。",
@@ -757,7 +900,19 @@ async def trigger_article_collection(
             if not _ARTICLE_COLLECT_LOCK.acquire(blocking=False):
                 logger.info("Article collection already running; skip starting another one.")
                 return
+            # 专用连接持有 advisory lock 直到采集结束（多 worker 部署下同一时刻只有一个采集任务）
+            lock_conn = None
             try:
+                lock_conn = engine.connect()
+                (locked,) = lock_conn.execute(
+                    text("SELECT pg_try_advisory_lock(:k)"), {"k": _ARTICLE_COLLECT_ADVISORY_KEY}
+                ).first()
+                lock_conn.commit()
+                if not locked:
+                    lock_conn.close()
+                    lock_conn = None
+                    raise RuntimeError("已有采集任务在其他进程中运行")
+
                 worker = IngestionWorker()
                 s = SessionLocal()
                 try:
@@ -768,7 +923,7 @@ async def trigger_article_collection(
                     job_row.started_at = datetime.utcnow()
 
                     accounts = (
-                        s.query(OfficialAccount)
+                        s.query(OfficialAccount.id, OfficialAccount.name)
                         .filter(OfficialAccount.is_active == True)
                         .order_by(OfficialAccount.id.asc())
                         .all()
@@ -779,44 +934,66 @@ async def trigger_article_collection(
                     total_new = 0
                     total_skipped = 0
                     error_count = 0
-                    details_accounts: list[dict[str, Any]] = []
-                    details_errors: list[dict[str, Any]] = []
-
-                    for idx, account in enumerate(accounts, start=1):
+                    # 只保留最近的明细，避免 details 无限增长
+                    details_accounts: deque[dict[str, Any]] = deque(maxlen=100)
+                    details_errors: deque[dict[str, Any]] = deque(maxlen=50)
+                    # 进度行节流写入：最多每 2 秒一次（出错时和最后一个账号立即写）
+                    last_commit_ts = time.monotonic()
+
+                    def _collect_one(account_id: int) -> tuple[int, str | None, int]:
+                        # Session 不是线程安全的：每个账号使用独立会话
                         t0 = time.time()
-                        new_count = 0
-                        err: str | None = None
+                        ts = SessionLocal()
                         try:
+                            account = ts.get(OfficialAccount, account_id)
+                            if account is None:
+                                return 0, None, 0
                             # collect_feed may use sqlite (preferred) or fallback to HTTP RSS.
-                            new_count = worker.collect_feed(s, account)
+                            new_count = worker.collect_feed(ts, account)
+                            return int(new_count or 0), None, int((time.time() - t0) * 1000)
                         except Exception as e:
-                            err = str(e)
-                            error_count += 1
-                            job_row.last_error = f"{account.name}: {err}"
-                            details_errors.append({"account": account.name, "error": err})
-                            logger.error(f"Failed to collect from {account.name}: {err}")
-
-                        # Heuristic skipped count: if no new articles and feed has entries, it's likely all existed.
-                        # We don't have exact skipped count here; keep as best-effort.
-                        if new_count == 0 and not err:
-                            total_skipped += 1
-                        total_new += int(new_count or 0)
-
-                        details_accounts.append(
-                            {
-                                "account": account.name,
-                                "new": int(new_count or 0),
-                                "ok": err is None,
-                                "ms": int((time.time() - t0) * 1000),
-                            }
-                        )
-
-                        job_row.processed_accounts = idx
-                        job_row.new_articles = total_new
-                        job_row.skipped_articles = total_skipped
-                        job_row.error_count = error_count
-                        job_row.details = {"accounts": details_accounts[-100:], "errors": details_errors[-50:]}
-                        s.commit()
+                            ts.rollback()
+                            return 0, str(e), int((time.time() - t0) * 1000)
+                        finally:
+                            ts.close()
+
+                    # 采集以网络 IO 为主，按账号并发执行
+                    max_workers = max(1, int(os.getenv("ARTICLE_COLLECT_CONCURRENCY", "8") or "8"))
+                    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                        futures = {pool.submit(_collect_one, acc_id): acc_name for acc_id, acc_name in accounts}
+                        for idx, future in enumerate(as_completed(futures), start=1):
+                            account_name = futures[future]
+                            new_count, err, elapsed_ms = future.result()
+                            if err is not None:
+                                error_count += 1
+                                job_row.last_error = f"{account_name}: {err}"
+                                details_errors.append({"account": account_name, "error": err})
+                                logger.error(f"Failed to collect from {account_name}: {err}")
+
+                            # Heuristic skipped count: if no new articles and feed has entries, it's likely all existed.
+                            # We don't have exact skipped count here; keep as best-effort.
+                            if new_count == 0 and not err:
+                                total_skipped += 1
+                            total_new += new_count
+
+                            details_accounts.append(
+                                {
+                                    "account": account_name,
+                                    "new": new_count,
+                                    "ok": err is None,
+                                    "ms": elapsed_ms,
+                                }
+                            )
+
+                            job_row.processed_accounts = idx
+                            job_row.new_articles = total_new
+                            job_row.skipped_articles = total_skipped
+                            job_row.error_count = error_count
+                            now_ts = time.monotonic()
+                            if err is not None or idx == len(accounts) or now_ts - last_commit_ts > 2.0:
+                                job_row.details = {"accounts": list(details_accounts), "errors": list(details_errors)}
+                                s.commit()
+                                last_commit_ts = now_ts
 
                     job_row.status = ArticleCollectionJobStatus.SUCCESS if error_count == 0 else ArticleCollectionJobStatus.FAILED
                     job_row.finished_at = datetime.utcnow()
@@ -841,6 +1018,16 @@ async def trigger_article_collection(
                 except Exception:
                     pass
             finally:
+                if lock_conn is not None:
+                    try:
+                        lock_conn.execute(
+                            text("SELECT pg_advisory_unlock(:k)"), {"k": _ARTICLE_COLLECT_ADVISORY_KEY}
+                        )
+                        lock_conn.commit()
+                    except Exception:
+                        pass
+                    finally:
+                        lock_conn.close()
                 try:
                     _ARTICLE_COLLECT_LOCK.release()
                 except Exception:
@@ -914,32 +1101,34 @@ async def get_article_collection_status(
 @router.get("/articles/collect/jobs", response_model=list[ArticleCollectionJobResponse])
 async def list_article_collection_jobs(
     limit: int = Query(20, ge=1, le=200),
+    before_id: Optional[int] = Query(None, description="键集分页游标：上一页最后一条的 id"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """列出最近的采集任务"""
-    jobs = db.query(ArticleCollectionJob).order_by(ArticleCollectionJob.created_at.desc()).limit(limit).all()
-    out: list[ArticleCollectionJobResponse] = []
-    for job in jobs:
-        out.append(
-            ArticleCollectionJobResponse(
-                id=job.id,
-                status=job.status.value if hasattr(job.status, "value") else str(job.status),
-                requested_by=job.requested_by,
-                mode=job.mode,
-                total_accounts=job.total_accounts or 0,
-                processed_accounts=job.processed_accounts or 0,
-                new_articles=job.new_articles or 0,
-                skipped_articles=job.skipped_articles or 0,
-                error_count=job.error_count or 0,
-                last_error=job.last_error,
-                details=job.details,
-                created_at=job.created_at.isoformat() if job.created_at else "",
-                started_at=job.started_at.isoformat() if job.started_at else None,
-                finished_at=job.finished_at.isoformat() if job.finished_at else None,
-            )
-        )
-    return out
+    """列出最近的采集任务（id 按创建顺序递增，翻页用 before_id 沿主键定位）"""
+    # 按列查询 + Row._asdict()：不构造 ORM 对象，也不在 Python 里逐字段拼 dict；
+    # 计数列的 NULL 在 SQL 里补 0，状态枚举由 orjson 直接输出其值
+    query = db.query(
+        ArticleCollectionJob.id,
+        ArticleCollectionJob.status,
+        ArticleCollectionJob.requested_by,
+        ArticleCollectionJob.mode,
+        func.coalesce(ArticleCollectionJob.total_accounts, 0).label("total_accounts"),
+        func.coalesce(ArticleCollectionJob.processed_accounts, 0).label("processed_accounts"),
+        func.coalesce(ArticleCollectionJob.new_articles, 0).label("new_articles"),
+        func.coalesce(ArticleCollectionJob.skipped_articles, 0).label("skipped_articles"),
+        func.coalesce(ArticleCollectionJob.error_count, 0).label("error_count"),
+        ArticleCollectionJob.last_error,
+        ArticleCollectionJob.details,
+        ArticleCollectionJob.created_at,
+        ArticleCollectionJob.started_at,
+        ArticleCollectionJob.finished_at,
+    )
+    if before_id is not None:
+        query = query.filter(ArticleCollectionJob.id < before_id)
+    rows = query.order_by(ArticleCollectionJob.id.desc()).limit(limit).all()
+    # orjson 对 naive datetime 的输出与 isoformat() 一致
+    return _orjson_response([row._asdict() for row in rows])
 
 
 @router.post("/articles/clear", status_code=status.HTTP_200_OK)
@@ -950,8 +1139,13 @@ async def clear_all_articles(
     """清空所有文章（管理后台）"""
     try:
         # Use TRUNCATE for speed; also reset official account counters.
-        db.execute(text("TRUNCATE TABLE scraped_articles RESTART IDENTITY"))
-        db.execute(text("UPDATE official_accounts SET total_articles=0, last_collection_time=NULL"))
+        # 多条语句一次发送（同一事务，一次往返）；ANALYZE 空表几乎无开销，
+        # 让文章列表总数估算（pg_class.reltuples）立即归零
+        db.execute(text(
+            "TRUNCATE TABLE scraped_articles RESTART IDENTITY; "
+            "UPDATE official_accounts SET total_articles=0, last_collection_time=NULL; "
+            "ANALYZE scraped_articles"
+        ))
         db.commit()
         logger.warning(f"All articles cleared by {current_user.username}")
         return {"status": "success", "message": "已清空所有文章"}
@@ -969,8 +1163,9 @@ async def clear_all_articles(
 class ReportResponse(BaseModel):
     """报告响应模型"""
     id: int
-    report_type: str
-    report_date: str
+    # 枚举/日期保留原类型，由 pydantic-core 序列化为 "daily" / "YYYY-MM-DD"
+    report_type: ReportType
+    report_date: date
     title: str
     summary_markdown: str
     analysis_markdown: str | None
@@ -980,48 +1175,87 @@ class ReportResponse(BaseModel):
     sent_count: int
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 @router.get("/reports", response_model=List[ReportResponse])
 async def list_reports(
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="兼容旧分页；深翻页请改用 before_date/before_id"),
     limit: int = Query(100, ge=1, le=1000),
     report_type: Optional[str] = None,
+    before_date: Optional[date] = Query(None, description="键集分页游标：上一页最后一条的 report_date"),
+    before_id: Optional[int] = Query(None, description="键集分页游标：上一页最后一条的 id"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """获取报告列表（管理后台）"""
-    query = db.query(Report)
+    """
+    获取报告列表（管理后台）
+
+    满页时响应头 X-Next-Cursor 给出下一页的查询参数（before_date=...&before_id=...）
+    """
+    # 只取序列化用到的列（不取 source_article_ids 等大字段），按列查询不构造 ORM 对象，
+    # 每行直接 Row._asdict()；报告类型枚举由 orjson 直接输出其值
+    query = db.query(
+        Report.id,
+        Report.report_type,
+        Report.report_date,
+        Report.title,
+        Report.summary_markdown,
+        Report.analysis_markdown,
+        Report.content_json,
+        Report.article_count,
+        Report.view_count,
+        Report.sent_count,
+        Report.created_at,
+    )
     
     if report_type:
         query = query.filter(Report.report_type == ReportType(report_type))
     
-    reports = query.order_by(desc(Report.report_date)).offset(skip).limit(limit).all()
+    # 键集分页：按 (report_date, id) 直接定位，不用 OFFSET 扫描再丢弃前面的行
+    if before_date is not None:
+        if before_id is not None:
+            query = query.filter(tuple_(Report.report_date, Report.id) < tuple_(before_date, before_id))
+        else:
+            query = query.filter(Report.report_date < before_date)
     
-    # 显式转换枚举值为字符串
-    return [
-        ReportResponse(
-            id=r.id,
-            report_type=r.report_type.value,
-            report_date=r.report_date.isoformat(),
-            title=r.title,
-            summary_markdown=r.summary_markdown,
-            analysis_markdown=r.analysis_markdown,
-            content_json=getattr(r, "content_json", None),
-            article_count=r.article_count,
-            view_count=r.view_count,
-            sent_count=r.sent_count,
-            created_at=r.created_at
-        )
-        for r in reports
+    # 报告行带整篇 markdown，limit 最大 1000：服务端游标分批取（每批 200 行），边取边转成 dict
+    # date/datetime 由 orjson 直接编码为 ISO 格式
+    items = [
+        row._asdict()
+        for row in query.order_by(desc(Report.report_date), desc(Report.id))
+        .offset(skip)
+        .limit(limit)
+        .yield_per(_LIST_FETCH_SIZE)
     ]
+    headers = None
+    if len(items) == limit:
+        last = items[-1]
+        headers = {"X-Next-Cursor": urlencode({"before_date": last["report_date"].isoformat(), "before_id": last["id"]})}
+    return _orjson_response(items, headers=headers)
+
+
+def _increment_report_view_count(report_id: int) -> None:
+    """查看次数 +1（原子 UPDATE，并发查看不丢计数）；在响应发出后的后台任务里执行"""
+    s = SessionLocal()
+    try:
+        s.execute(
+            update(Report)
+            .where(Report.id == report_id)
+            .values(view_count=func.coalesce(Report.view_count, 0) + 1)
+        )
+        s.commit()
+    except Exception as e:
+        s.rollback()
+        logger.warning(f"Failed to increment view_count for report {report_id}: {e}")
+    finally:
+        s.close()
 
 
 @router.get("/reports/{report_id}", response_model=ReportResponse)
 async def get_report(
     report_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
@@ -1033,24 +1267,11 @@ async def get_report(
             detail="Report not found"
         )
     
-    # 增加查看次数
-    report.view_count += 1
-    db.commit()
-    
-    # 显式转换枚举值为字符串
-    return ReportResponse(
-        id=report.id,
-        report_type=report.report_type.value,
-        report_date=report.report_date.isoformat(),
-        title=report.title,
-        summary_markdown=report.summary_markdown,
-        analysis_markdown=report.analysis_markdown,
-        content_json=getattr(report, "content_json", None),
-        article_count=report.article_count,
-        view_count=report.view_count,
-        sent_count=report.sent_count,
-        created_at=report.created_at
-    )
+    # 计数写入放到后台任务，响应不再等待 COMMIT；返回值按本次查看后的计数给出
+    background_tasks.add_task(_increment_report_view_count, report_id)
+    result = ReportResponse.model_validate(report)
+    result.view_count = (report.view_count or 0) + 1
+    return result
 
 
 @router.delete("/reports/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1060,17 +1281,19 @@ async def delete_report(
     current_user: User = Depends(get_current_active_user),
 ):
     """删除报告"""
-    report = db.query(Report).filter(Report.id == report_id).first()
-    if not report:
+    # 单条 DELETE ... RETURNING：不先 SELECT 整行，只取日志要用的标题
+    title = db.execute(
+        delete(Report).where(Report.id == report_id).returning(Report.title)
+    ).scalar_one_or_none()
+    if title is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report not found"
         )
     
-    db.delete(report)
     db.commit()
     
-    logger.info(f"Report deleted: {report.title} by {current_user.username}")
+    logger.info(f"Report deleted: {title} by {current_user.username}")
 
 
 @router.post("/reports/{report_id}/regenerate", status_code=status.HTTP_202_ACCEPTED)
@@ -1085,8 +1308,6 @@ async def regenerate_report(
     根据报告日期重新生成日报。
     注意：为了避免 report_id 变化导致前端引用失效，日报会“原地更新”。
     """
-    from app.workers.ai_generate import AIWorker
-    
     # 获取原报告信息
     report = db.query(Report).filter(Report.id == report_id).first()
     if not report:
@@ -1120,28 +1341,15 @@ async def regenerate_daily_report_by_date(
     - 避免前端拿到旧 report_id 导致 404
     - 日报会“原地更新”（如果该日期已存在日报）
     """
-    from app.workers.ai_generate import AIWorker
-    from datetime import date, timedelta
-
     try:
-        target_date = date.fromisoformat(report_date)
+        target_date = _parse_iso_date(report_date)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="report_date 格式错误，需为 YYYY-MM-DD"
         )
 
-    tomorrow = target_date + timedelta(days=1)
-    article_count = db.query(Article).filter(
-        Article.published_at >= target_date,
-        Article.published_at < tomorrow
-    ).count()
-    if article_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"无法重新生成：{target_date} 没有文章数据。请检查文章采集是否正常，或该日期确实没有发布文章。"
-        )
-
+    # 当天是否有文章由 _enqueue_regenerate_daily_job 统一检查
     return await _enqueue_regenerate_daily_job(
         db=db,
         target_date=target_date,
@@ -1153,34 +1361,62 @@ async def regenerate_daily_report_by_date(
 async def _enqueue_regenerate_daily_job(db: Session, target_date, requested_by: str, force: bool = False):
     """创建/复用一个 pending/running 的日报再生成任务（非阻塞）"""
     tomorrow = target_date + timedelta(days=1)
-    article_count = db.query(Article).filter(
+    # 只需要判断“有没有”，取到一行即可停止（走 published_at 索引），不必 count 整天
+    has_articles = db.query(Article.id).filter(
         Article.published_at >= target_date,
         Article.published_at < tomorrow
-    ).count()
-    if article_count == 0:
+    ).first() is not None
+    if not has_articles:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"无法重新生成：{target_date} 没有文章数据。请检查文章采集是否正常，或该日期确实没有发布文章。"
         )
 
-    existing = db.query(ReportJob).filter(
-        ReportJob.job_type == ReportJobType.REGENERATE_DAILY,
-        ReportJob.target_date == target_date,
-        ReportJob.status.in_([ReportJobStatus.PENDING, ReportJobStatus.RUNNING])
-    ).order_by(ReportJob.created_at.desc()).first()
-
-    # 如果已有任务：支持 force 强制重新入队；以及回收“卡死”的 RUNNING（worker 重启后会永远卡住）
-    if existing:
-        stale_minutes = int(os.getenv("REPORT_JOB_STALE_MINUTES", "60"))
-        is_running = existing.status == ReportJobStatus.RUNNING
-        is_stale_running = bool(
-            is_running
-            and existing.started_at is not None
-            and (datetime.utcnow() - existing.started_at) > timedelta(minutes=stale_minutes)
-            and existing.finished_at is None
-        )
+    def _try_insert_job() -> Optional[int]:
+        # 同一日期同时只允许一个 PENDING/RUNNING 任务（唯一部分索引 idx_report_jobs_single_active）：
+        # 冲突时不插入、返回 None，并发入队不会出现重复任务
+        return db.execute(
+            pg_insert(ReportJob)
+            .values(
+                job_type=ReportJobType.REGENERATE_DAILY,
+                status=ReportJobStatus.PENDING,
+                target_date=target_date,
+                requested_by=requested_by,
+            )
+            .on_conflict_do_nothing()
+            .returning(ReportJob.id)
+        ).scalar_one_or_none()
+
+    # 正常路径：一次 INSERT 即完成入队
+    job_id = _try_insert_job()
+    if job_id is None:
+        existing = db.query(ReportJob).filter(
+            ReportJob.job_type == ReportJobType.REGENERATE_DAILY,
+            ReportJob.target_date == target_date,
+            ReportJob.status.in_([ReportJobStatus.PENDING, ReportJobStatus.RUNNING])
+        ).order_by(ReportJob.created_at.desc()).first()
+
+        # 如果已有任务：支持 force 强制重新入队；以及回收“卡死”的 RUNNING（worker 重启后会永远卡住）
+        if existing:
+            stale_minutes = int(os.getenv("REPORT_JOB_STALE_MINUTES", "60"))
+            is_running = existing.status == ReportJobStatus.RUNNING
+            is_stale_running = bool(
+                is_running
+                and existing.started_at is not None
+                and (datetime.utcnow() - existing.started_at) > timedelta(minutes=stale_minutes)
+                and existing.finished_at is None
+            )
+
+            if not (force or is_stale_running):
+                logger.info(f"Regen job already queued/running: job_id={existing.id} date={target_date} by {requested_by}")
+                return {
+                    "status": "queued",
+                    "message": f"已存在进行中的任务（job_id={existing.id}），请稍后刷新或在系统日志查看进度。"
+                               f"（如需强制重跑，可带参数 force=true）",
+                    "job_id": existing.id,
+                    "target_date": str(target_date),
+                }
 
-        if force or is_stale_running:
             # 标记旧任务失败（避免永远拦截）
             existing.status = ReportJobStatus.FAILED
             existing.finished_at = datetime.utcnow()
@@ -1188,35 +1424,27 @@ async def _enqueue_regenerate_daily_job(db: Session, target_date, requested_by:
                 existing.error_message = f"Superseded by forced requeue by {requested_by}"
             else:
                 existing.error_message = f"Stale RUNNING reclaimed after {stale_minutes} minutes (worker may have restarted)"
-            db.commit()
+            db.flush()
             logger.warning(
                 f"Requeue allowed (force={force}, stale={is_stale_running}): "
                 f"old_job_id={existing.id} date={target_date} by {requested_by}"
             )
-        else:
-            logger.info(f"Regen job already queued/running: job_id={existing.id} date={target_date} by {requested_by}")
-            return {
-                "status": "queued",
-                "message": f"已存在进行中的任务（job_id={existing.id}），请稍后刷新或在系统日志查看进度。"
-                           f"（如需强制重跑，可带参数 force=true）",
-                "job_id": existing.id,
-                "target_date": str(target_date),
-            }
 
-    job = ReportJob(
-        job_type=ReportJobType.REGENERATE_DAILY,
-        status=ReportJobStatus.PENDING,
-        target_date=target_date,
-        requested_by=requested_by,
-    )
-    db.add(job)
+        # 旧任务已让位（或在查询前刚好结束），再插入一次
+        job_id = _try_insert_job()
+        if job_id is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{target_date} 的再生成任务刚被其他请求提交，请刷新后查看。",
+            )
+
     db.commit()
-    db.refresh(job)
-    logger.info(f"Queued regen job: job_id={job.id} date={target_date} by {requested_by}")
+    logger.info(f"Queued regen job: job_id={job_id} date={target_date} by {requested_by}")
     return {
         "status": "queued",
-        "message": f"已提交后台任务（job_id={job.id}），生成期间系统不会卡死。可在“系统日志”查看进度。",
-        "job_id": job.id,
+        "message": f"已提交后台任务（job_id={job_id}），生成期间系统不会卡死。可在“系统日志”查看进度。",
+        "job_id": job_id,
         "target_date": str(target_date),
     }
 
@@ -1283,41 +1511,40 @@ async def list_report_jobs(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="target_date 格式错误，需为 YYYY-MM-DD")
         q = q.filter(ReportJob.target_date == td)
 
-    jobs = q.order_by(ReportJob.created_at.desc()).limit(limit).all()
+    jobs = q.order_by(ReportJob.created_at.desc()).limit(limit).yield_per(_LIST_FETCH_SIZE)
 
     stale_minutes = int(os.getenv("REPORT_JOB_STALE_MINUTES", "60"))
     now_utc = datetime.utcnow()
-
-    def _to_utc_iso(dt: datetime | None) -> str | None:
-        if not dt:
-            return None
-        # DB stores naive UTC; return timezone-aware ISO for frontend conversion
-        return dt.replace(tzinfo=timezone.utc).isoformat()
+    # 循环内不变的量提到循环外
+    stale_after = timedelta(minutes=stale_minutes)
+    running = ReportJobStatus.RUNNING
 
     items = []
     for j in jobs:
         is_stale = bool(
-            j.status == ReportJobStatus.RUNNING
+            j.status == running
             and j.started_at is not None
             and j.finished_at is None
-            and (now_utc - j.started_at) > timedelta(minutes=stale_minutes)
+            and (now_utc - j.started_at) > stale_after
         )
         items.append(
             {
                 "id": j.id,
                 "job_type": j.job_type.value,
                 "status": j.status.value,
-                "target_date": str(j.target_date),
+                "target_date": j.target_date,
                 "report_id": j.report_id,
                 "requested_by": j.requested_by,
-                "created_at": _to_utc_iso(j.created_at),
-                "started_at": _to_utc_iso(j.started_at),
-                "finished_at": _to_utc_iso(j.finished_at),
+                "created_at": j.created_at,
+                "started_at": j.started_at,
+                "finished_at": j.finished_at,
                 "error_message": j.error_message or "",
                 "is_stale": is_stale,
             }
         )
-    return {"items": items, "stale_minutes": stale_minutes}
+    # DB stores naive UTC; orjson formats date/datetime natively and OPT_NAIVE_UTC
+    # yields the timezone-aware "+00:00" ISO strings the frontend converts
+    return _orjson_response({"items": items, "stale_minutes": stale_minutes}, option=orjson.OPT_NAIVE_UTC)
 
 
 @router.post("/jobs/{job_id}/cancel", status_code=status.HTTP_200_OK)
@@ -1389,30 +1616,32 @@ async def get_stats(
     current_user: User = Depends(get_current_active_user),
 ):
     """获取仪表板统计信息"""
-    total_accounts = db.query(OfficialAccount).count()
-    active_accounts = db.query(OfficialAccount).filter(OfficialAccount.is_active == True).count()
-    
-    total_articles = db.query(Article).count()
-    pending_articles = db.query(Article).filter(Article.status == ArticleStatus.PENDING).count()
-    
-    total_subscribers = db.query(Subscriber).count()
-    active_subscribers = db.query(Subscriber).filter(Subscriber.is_active == True).count()
-    
-    total_reports = db.query(Report).count()
-    daily_reports = db.query(Report).filter(Report.report_type == ReportType.DAILY).count()
-    weekly_reports = db.query(Report).filter(Report.report_type == ReportType.WEEKLY).count()
+    # 每张表一个带 FILTER 的聚合子查询，三者交叉连接成一行：一次往返、每表扫描一次
+    accounts = select(
+        func.count().label("total_accounts"),
+        func.count().filter(OfficialAccount.is_active == True).label("active_accounts"),
+    ).select_from(OfficialAccount).subquery()
+    articles = select(
+        func.count().label("total_articles"),
+        func.count().filter(Article.status == ArticleStatus.PENDING).label("pending_articles"),
+    ).select_from(Article).subquery()
+    subscribers = select(
+        func.count().label("total_subscribers"),
+        func.count().filter(Subscriber.is_active == True).label("active_subscribers"),
+    ).select_from(Subscriber).subquery()
+    reports = select(
+        func.count().label("total_reports"),
+        func.count().filter(Report.report_type == ReportType.DAILY).label("daily_reports"),
+        func.count().filter(Report.report_type == ReportType.WEEKLY).label("weekly_reports"),
+    ).select_from(Report).subquery()
+
+    row = db.execute(
+        select(accounts, articles, subscribers, reports).select_from(
+            accounts.join(articles, true()).join(subscribers, true()).join(reports, true())
+        )
+    ).one()
     
-    return DashboardStats(
-        total_accounts=total_accounts,
-        active_accounts=active_accounts,
-        total_articles=total_articles,
-        pending_articles=pending_articles,
-        total_subscribers=total_subscribers,
-        active_subscribers=active_subscribers,
-        total_reports=total_reports,
-        daily_reports=daily_reports,
-        weekly_reports=weekly_reports,
-    )
+    return DashboardStats(**row._mapping)
 
 
 # ==================== 报告生成控制 ====================
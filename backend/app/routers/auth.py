@@ -4,8 +4,10 @@
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 from shared.database import get_db, User
 from shared.config import settings
@@ -37,8 +39,7 @@ class UserResponse(BaseModel):
     is_superuser: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserCreate(BaseModel):
@@ -59,7 +60,12 @@ async def login(
     用户登录，获取访问令牌
     """
     user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # bcrypt 是 CPU 密集操作（~100ms+），放到线程池，避免阻塞事件循环；
+    # 用户不存在时也跑一次占位比较，响应时间不暴露用户名是否存在
+    password_ok = await run_in_threadpool(
+        verify_password, form_data.password, user.hashed_password if user else None
+    )
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -104,43 +110,47 @@ async def register(
     """
     用户注册（仅限超级用户或首次注册）
     """
-    # 检查是否已有用户
-    existing_users = db.query(User).count()
-    
-    # 如果已有用户，需要超级用户权限
-    if existing_users > 0:
-        # 这里可以添加权限检查，暂时允许注册
-        pass
+    # 用户名/邮箱冲突一次查出（最多两行）
+    clashes = db.query(User.username, User.email).filter(
+        or_(User.username == user_data.username, User.email == user_data.email)
+    ).all()
     
     # 检查用户名是否已存在
-    if db.query(User).filter(User.username == user_data.username).first():
+    if any(c.username == user_data.username for c in clashes):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
     # 检查邮箱是否已存在
-    if db.query(User).filter(User.email == user_data.email).first():
+    if clashes:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # 创建新用户
+    # 检查是否已有用户：只需判断有无，取一行即可，不必 count 全表
+    # 如果已有用户，需要超级用户权限（这里可以添加权限检查，暂时允许注册）
+    is_first_user = db.query(User.id).first() is None
+    
+    # 创建新用户（bcrypt 哈希放到线程池）
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         is_active=True,
-        is_superuser=user_data.is_superuser if existing_users == 0 else False,  # 第一个用户自动成为超级用户
+        is_superuser=user_data.is_superuser if is_first_user else False,  # 第一个用户自动成为超级用户
     )
     
     db.add(user)
+    # flush 时 id 由 INSERT ... RETURNING 回填，其余默认值在 Python 侧生成；
+    # commit 前生成响应，不再 refresh
+    db.flush()
+    result = UserResponse.model_validate(user)
     db.commit()
-    db.refresh(user)
     
-    logger.info(f"New user registered: {user.username}")
+    logger.info(f"New user registered: {result.username}")
     
-    return user
-
+    return result
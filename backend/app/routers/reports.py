@@ -1,11 +1,13 @@
 """
 报告API路由
 """
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, load_only
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
 
 from shared.database import get_db, Report, ReportType
 from shared.utils import get_logger
@@ -17,36 +19,62 @@ logger = get_logger("api.reports")
 class ReportResponse(BaseModel):
     """报告响应模型"""
     id: int
-    report_type: str
-    report_date: str
+    # 枚举/日期保留原类型，由 pydantic-core 序列化为 "daily" / ISO 字符串
+    report_type: ReportType
+    report_date: date
     title: str
     summary_markdown: str
     analysis_markdown: Optional[str]
     content_json: Optional[Dict[str, Any]] = None
     article_count: int
-    created_at: str
+    created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+_REPORT_LIST = TypeAdapter(List[ReportResponse])
+
+
+def _json_response(body: bytes) -> Response:
+    """
+    直接返回 pydantic-core 编码好的 JSON，跳过 FastAPI 对返回值的二次校验和 jsonable_encoder
+    （response_model 仍保留在路由上，仅用于 OpenAPI 文档）
+    """
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/", response_model=List[ReportResponse])
 async def get_reports(
     report_type: Optional[str] = Query(None, description="报告类型: daily/weekly"),
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="兼容旧分页；深翻页请改用 before_date/before_id"),
     start_date: Optional[str] = Query(None, description="开始日期 (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="结束日期 (YYYY-MM-DD)"),
+    before_date: Optional[date] = Query(None, description="键集分页游标：上一页最后一条的 report_date"),
+    before_id: Optional[int] = Query(None, description="键集分页游标：上一页最后一条的 id"),
     db: Session = Depends(get_db)
 ):
     """
     获取报告列表
     
-    支持分页、类型筛选和日期范围查询
+    支持分页、类型筛选和日期范围查询；
+    满页时响应头 X-Next-Cursor 给出下一页的查询参数（before_date=...&before_id=...）
     """
-    from datetime import date
-    
-    query = db.query(Report)
+    # 只取响应用到的列；误访问未加载的列会直接报错，而不是逐行补查
+    query = db.query(Report).options(
+        load_only(
+            Report.id,
+            Report.report_type,
+            Report.report_date,
+            Report.title,
+            Report.summary_markdown,
+            Report.analysis_markdown,
+            Report.content_json,
+            Report.article_count,
+            Report.created_at,
+            raiseload=True,
+        )
+    )
     
     if report_type:
         query = query.filter(Report.report_type == ReportType(report_type))
@@ -66,24 +94,24 @@ async def get_reports(
         except ValueError:
             pass
     
+    # 键集分页：按 (report_date, id) 直接定位，不用 OFFSET 扫描再丢弃前面的行
+    if before_date is not None:
+        if before_id is not None:
+            query = query.filter(tuple_(Report.report_date, Report.id) < tuple_(before_date, before_id))
+        else:
+            query = query.filter(Report.report_date < before_date)
+    
     reports = query.order_by(
-        Report.report_date.desc()
+        Report.report_date.desc(), Report.id.desc()
     ).offset(offset).limit(limit).all()
     
-    return [
-        ReportResponse(
-            id=r.id,
-            report_type=r.report_type.value,
-            report_date=r.report_date.isoformat(),
-            title=r.title,
-            summary_markdown=r.summary_markdown,
-            analysis_markdown=r.analysis_markdown,
-            content_json=getattr(r, "content_json", None),
-            article_count=r.article_count,
-            created_at=r.created_at.isoformat()
+    response = _json_response(_REPORT_LIST.dump_json(_REPORT_LIST.validate_python(reports, from_attributes=True)))
+    if len(reports) == limit:
+        last = reports[-1]
+        response.headers["X-Next-Cursor"] = urlencode(
+            {"before_date": last.report_date.isoformat(), "before_id": last.id}
         )
-        for r in reports
-    ]
+    return response
 
 
 @router.get("/latest/{report_type}", response_model=ReportResponse)
@@ -104,17 +132,7 @@ async def get_latest_report(
             detail=f"No {report_type} report found"
         )
     
-    return ReportResponse(
-        id=report.id,
-        report_type=report.report_type.value,
-        report_date=report.report_date.isoformat(),
-        title=report.title,
-        summary_markdown=report.summary_markdown,
-        analysis_markdown=report.analysis_markdown,
-        content_json=getattr(report, "content_json", None),
-        article_count=report.article_count,
-        created_at=report.created_at.isoformat()
-    )
+    return _json_response(ReportResponse.model_validate(report).model_dump_json().encode())
 
 
 @router.get("/{report_id}", response_model=ReportResponse)
@@ -130,15 +148,5 @@ async def get_report_by_id(
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return ReportResponse(
-        id=report.id,
-        report_type=report.report_type.value,
-        report_date=report.report_date.isoformat(),
-        title=report.title,
-        summary_markdown=report.summary_markdown,
-        analysis_markdown=report.analysis_markdown,
-        content_json=getattr(report, "content_json", None),
-        article_count=report.article_count,
-        created_at=report.created_at.isoformat()
-    )
+    return _json_response(ReportResponse.model_validate(report).model_dump_json().encode())
 
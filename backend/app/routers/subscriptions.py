@@ -1,17 +1,23 @@
 """
 订阅管理路由 - 实现Double Opt-In
 """
+import hashlib
 import secrets
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import RedirectResponse
+from sqlalchemy import func, or_, text, update
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
 
+from shared.auth import hash_token, is_well_formed_token
 from shared.database import get_db, Subscriber
 from shared.config import settings
-from shared.utils import get_logger
+from shared.utils import get_logger, get_redis_client
 from ..services.email_service import send_verification_email, email_config_status
+from ..services.email_queue import enqueue_verification_email
 
 router = APIRouter()
 logger = get_logger("api.subscriptions")
@@ -22,12 +28,61 @@ class SubscribeRequest(BaseModel):
     email: EmailStr
 
 
+# 字段全部由服务端填充，返回时用 model_construct 跳过构造期校验（输出仍按 response_model 校验）
 class SubscribeResponse(BaseModel):
     """订阅响应模型"""
     message: str
     email: str
 
 
+# 同一邮箱的订阅请求在该窗口内只处理一次
+_SUBSCRIBE_DEDUP_SECONDS = 60
+
+
+def _subscribe_slot_key(email: str) -> str:
+    return f"sub:pending:{hashlib.sha256(email.lower().encode()).hexdigest()}"
+
+
+# 以下 Redis 辅助函数都是同步阻塞调用（Redis 不可达时会等到连接超时），
+# 在 async 路由里一律经 run_in_threadpool 调用，不阻塞事件循环
+def _claim_subscribe_slot(email: str) -> bool:
+    """
+    SET NX EX 占位：窗口内的重复订阅请求不再触达数据库与邮件服务（也防止验证邮件轰炸）
+
+    Redis 不可用时放行，不影响正常订阅
+    """
+    try:
+        return bool(get_redis_client().set(_subscribe_slot_key(email), "1", nx=True, ex=_SUBSCRIBE_DEDUP_SECONDS))
+    except RedisError as e:
+        logger.warning(f"Subscribe dedup unavailable, letting request through: {e}")
+        return True
+
+
+def _release_subscribe_slot(email: str) -> None:
+    """请求处理失败时释放占位，用户可以立即重试"""
+    try:
+        get_redis_client().delete(_subscribe_slot_key(email))
+    except RedisError as e:
+        logger.warning(f"Failed to release subscribe slot: {e}")
+
+
+def _commit_pending(db: Session) -> None:
+    """
+    提交未激活订阅的写入，不等待 WAL 刷盘（synchronous_commit=off，仅作用于本事务）
+
+    未激活记录在数据库崩溃时最多丢失最近几百毫秒的写入，用户重新订阅即可；
+    突发订阅时不再每条都等一次 fsync
+    """
+    db.execute(text("SET LOCAL synchronous_commit TO OFF"))
+    db.commit()
+
+
+def _dispatch_verification_email(background_tasks: BackgroundTasks, email: str, token: str) -> None:
+    """验证邮件优先入 Redis 队列由 email-worker 限速发送；队列不可用时退回进程内后台任务"""
+    if not enqueue_verification_email(email, token):
+        background_tasks.add_task(send_verification_email, email=email, token=token)
+
+
 @router.post("/", response_model=SubscribeResponse)
 async def subscribe_user(
     request: SubscribeRequest,
@@ -45,33 +100,55 @@ async def subscribe_user(
     """
     email = request.email
 
+    if not await run_in_threadpool(_claim_subscribe_slot, email):
+        return SubscribeResponse.model_construct(
+            message="请求过于频繁，请稍后再试（如已提交请查收验证邮件）",
+            email=email
+        )
+
+    # 数据库写入与验证邮件入队都是同步调用，放到线程池执行
+    try:
+        return await run_in_threadpool(_register_subscription, email, background_tasks, db)
+    except Exception:
+        await run_in_threadpool(_release_subscribe_slot, email)
+        raise
+
+
+def _register_subscription(email: str, background_tasks: BackgroundTasks, db: Session) -> SubscribeResponse:
+    """登记（或刷新）未激活订阅并派发验证邮件"""
     # 邮件配置自检：避免“提示成功但实际上不发信”的假成功
     email_ok, email_reason = email_config_status()
     
-    # 检查是否已订阅
-    existing = db.query(Subscriber).filter(Subscriber.email == email).first()
+    # 检查是否已订阅：只取 id/is_active 两列，不构造 ORM 对象
+    existing = db.query(Subscriber.id, Subscriber.is_active).filter(Subscriber.email == email).first()
     
     if existing:
         if existing.is_active:
-            return SubscribeResponse(
+            return SubscribeResponse.model_construct(
                 message="该邮箱已经订阅",
                 email=email
             )
         else:
-            # 重新发送验证邮件
+            # 重新发送验证邮件：按主键直接 UPDATE，不再加载整行
             token = secrets.token_urlsafe(32)
-            existing.verification_token = token
-            existing.token_expiry = datetime.utcnow() + timedelta(hours=24)
-            db.commit()
+            db.execute(
+                update(Subscriber)
+                .where(Subscriber.id == existing.id)
+                .values(
+                    verification_token=hash_token(token),
+                    token_expiry=datetime.utcnow() + timedelta(hours=24),
+                )
+            )
+            _commit_pending(db)
             
-            if email_ok: background_tasks.add_task(send_verification_email, email=email, token=token)
+            if email_ok: _dispatch_verification_email(background_tasks, email, token)
             else:
                 logger.error(
                     f"Email not configured; verification email not sent. "
                     f"email={email}, reason={email_reason}"
             )
             
-            return SubscribeResponse(
+            return SubscribeResponse.model_construct(
                 message="验证邮件已发送（如未收到请检查垃圾箱），或稍后重试",
                 email=email
             )
@@ -82,17 +159,19 @@ async def subscribe_user(
     subscriber = Subscriber(
         email=email,
         is_active=False,  # 关键：初始状态为未激活
-        verification_token=token,
+        verification_token=hash_token(token),  # 库里只存摘要，原始令牌只随邮件发出
         token_expiry=datetime.utcnow() + timedelta(hours=24)
     )
     
     db.add(subscriber)
-    db.commit()
+    _commit_pending(db)
     
     logger.info(f"New subscription request: {email}")
     
-    # 后台任务：发送验证邮件
-    if email_ok: background_tasks.add_task(send_verification_email, email=email, token=token)
+    # 验证邮件交给发送队列
+    if email_ok:
+        _dispatch_verification_email(background_tasks, email, token)
+        message = "验证邮件已发送（如未收到请检查垃圾箱），请点击邮件中的链接完成订阅"
     else:
         logger.error(
             f"Email not configured; verification email not sent. "
@@ -100,12 +179,41 @@ async def subscribe_user(
         )
         message = "订阅已登记，但邮件服务暂不可用，无法发送验证邮件，请联系管理员或稍后重试。"
     
-    return SubscribeResponse(
+    return SubscribeResponse.model_construct(
         message=message,
         email=email
     )
 
 
+# 已消费的验证令牌在该窗口内重复访问仍视为成功
+_VERIFIED_TOKEN_TTL_SECONDS = 300
+
+
+def _recently_verified(token_hash: str) -> bool:
+    """令牌是否刚刚验证成功过（Redis 不可用时按未验证处理）"""
+    try:
+        return bool(get_redis_client().exists(f"sub:verified:{token_hash}"))
+    except RedisError:
+        return False
+
+
+def _mark_verified(token_hash: str) -> None:
+    """记录刚验证成功的令牌"""
+    try:
+        get_redis_client().set(f"sub:verified:{token_hash}", "1", ex=_VERIFIED_TOKEN_TTL_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Failed to record verified token: {e}")
+
+
+def _confirmed_redirect() -> RedirectResponse:
+    """重定向到前端成功页面（避免浏览器显示 JSON）；允许客户端短暂复用，减少扫描器重复请求"""
+    return RedirectResponse(
+        url=f"{settings.WEB_URL}/subscription-confirmed",
+        status_code=303,
+        headers={"Cache-Control": "private, max-age=60"},
+    )
+
+
 @router.get("/verify/{token}")
 async def verify_subscription(
     token: str,
@@ -116,38 +224,58 @@ async def verify_subscription(
     
     用户点击邮件中的链接后到达此端点
     """
-    # 查找令牌
-    subscriber = db.query(Subscriber).filter(
-        Subscriber.verification_token == token
-    ).first()
-    
-    if not subscriber:
-        raise HTTPException(
-            status_code=404,
-            detail="无效的验证链接"
-        )
+    if not is_well_formed_token(token):
+        raise HTTPException(status_code=404, detail="无效的验证链接")
+
+    token_hash = hash_token(token)
+
+    # 邮件网关的安全扫描常会先预取一次链接，用户再点时令牌已被消费：
+    # 刚验证过的令牌直接重定向到成功页，不再走数据库
+    if await run_in_threadpool(_recently_verified, token_hash):
+        return _confirmed_redirect()
+
+    # 校验与激活合并为一条 UPDATE：令牌匹配且未过期才会命中（库里存的是摘要）
+    # 由数据库取当前 UTC 时间（列存的是 naive UTC），与会话时区设置无关
+    now = func.timezone("UTC", func.now())
+
+    def _activate(stored_token: str):
+        return db.execute(
+            update(Subscriber)
+            .where(
+                Subscriber.verification_token == stored_token,
+                or_(Subscriber.token_expiry.is_(None), Subscriber.token_expiry >= now),
+            )
+            .values(
+                is_active=True,
+                verification_token=None,  # 使令牌失效
+                activated_at=now,
+            )
+            .returning(Subscriber.email)
+        ).scalar_one_or_none()
+
+    email = _activate(token_hash)
+    if email is None:
+        # 过渡期兼容：改存摘要前签发的令牌库里是原文。令牌有效期 24h，上线满一天后删除此回退
+        email = _activate(token)
     
-    # 检查令牌是否过期
-    if subscriber.token_expiry and subscriber.token_expiry < datetime.utcnow():
+    if email is None:
+        # 只在失败路径上区分“无效”和“已过期”
+        if db.query(Subscriber.id).filter(Subscriber.verification_token.in_([token_hash, token])).first() is None:
+            raise HTTPException(
+                status_code=404,
+                detail="无效的验证链接"
+            )
         raise HTTPException(
             status_code=400,
             detail="验证链接已过期，请重新订阅"
         )
     
-    # 激活订阅
-    subscriber.is_active = True
-    subscriber.verification_token = None  # 使令牌失效
-    subscriber.activated_at = datetime.utcnow()
-    
     db.commit()
+    await run_in_threadpool(_mark_verified, token_hash)
     
-    logger.info(f"Subscription activated: {subscriber.email}")
+    logger.info(f"Subscription activated: {email}")
     
-    # 重定向到前端成功页面（避免浏览器显示 JSON）
-    return RedirectResponse(
-        url=f"{settings.WEB_URL}/subscription-confirmed",
-        status_code=303
-    )
+    return _confirmed_redirect()
 
 
 @router.post("/unsubscribe")
@@ -3,11 +3,14 @@ WeRSS重新登录相关API
 提供一次性token验证和公众号信息查询
 """
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy import or_
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
 
-from shared.database.database import SessionLocal
+from shared.auth import hash_token, is_well_formed_token
+from shared.database import get_db
 from shared.database.models import OneTimeToken, OfficialAccount
 from shared.utils import get_logger
 
@@ -16,6 +19,7 @@ logger = get_logger("werss-api")
 router = APIRouter()
 
 
+# 字段全部由服务端填充，返回时用 model_construct 跳过构造期校验（输出仍按 response_model 校验）
 class TokenVerifyResponse(BaseModel):
     """Token验证响应"""
     valid: bool
@@ -24,56 +28,68 @@ class TokenVerifyResponse(BaseModel):
     message: str
 
 
+# 查询token，并按 account_id 左连接公众号：一次往返拿到全部信息。
+# 语句在模块级构造一次，每次请求只绑定参数，命中 SQLAlchemy 的编译缓存
+_VERIFY_RELOGIN_STMT = (
+    select(
+        OneTimeToken.expiry,
+        OneTimeToken.account_id,
+        OfficialAccount.name.label("account_name"),
+    )
+    .outerjoin(OfficialAccount, OfficialAccount.werss_feed_id == OneTimeToken.account_id)
+    .where(
+        OneTimeToken.token == bindparam("token_hash"),
+        OneTimeToken.purpose == "werss_relogin",
+        OneTimeToken.is_used == False,
+    )
+    .limit(1)
+)
+
+
 @router.get("/api/werss-relogin/verify", response_model=TokenVerifyResponse)
-def verify_relogin_token(token: str = Query(..., description="一次性登录令牌")):
+def verify_relogin_token(
+    token: str = Query(..., description="一次性登录令牌"),
+    db: Session = Depends(get_db),
+):
     """
     验证WeRSS重新登录token
 
     验证一次性token的有效性，如果有效则返回关联的公众号信息
     Token验证后会标记为已使用（一次性使用）
     """
-    db = SessionLocal()
+    if not is_well_formed_token(token):
+        return TokenVerifyResponse.model_construct(valid=False, message="令牌无效或已使用")
+
     try:
-        # 查询token
-        one_time_token = db.query(OneTimeToken).filter(
-            OneTimeToken.token == token,
-            OneTimeToken.purpose == "werss_relogin",
-            OneTimeToken.is_used == False
-        ).first()
-
-        if not one_time_token:
+        row = db.execute(_VERIFY_RELOGIN_STMT, {"token_hash": hash_token(token)}).first()
+        if not row:
+            # 过渡期兼容：改存摘要前签发的令牌库里是原文。令牌有效期 24h，上线满一天后删除此回退
+            row = db.execute(_VERIFY_RELOGIN_STMT, {"token_hash": token}).first()
+
+        if not row:
             logger.warning(f"Invalid or used relogin token: {token[:8]}...")
-            return TokenVerifyResponse(
+            return TokenVerifyResponse.model_construct(
                 valid=False,
                 message="令牌无效或已使用"
             )
 
         # 检查是否过期
-        if one_time_token.expiry < datetime.utcnow():
+        if row.expiry < datetime.utcnow():
             logger.warning(f"Expired relogin token: {token[:8]}...")
-            return TokenVerifyResponse(
+            return TokenVerifyResponse.model_construct(
                 valid=False,
                 message="令牌已过期"
             )
 
-        # 从context中获取公众号ID
-        account_id = None
-        account_name = None
-        if one_time_token.context and "account_id" in one_time_token.context:
-            account_id = one_time_token.context["account_id"]
-
-            # 查询公众号信息
-            account = db.query(OfficialAccount).filter(
-                OfficialAccount.werss_feed_id == account_id
-            ).first()
-            if account:
-                account_name = account.name
+        # 名称来自连接到的公众号（可能不存在）
+        account_id = row.account_id
+        account_name = row.account_name
 
         # 标记token为已使用（但暂时不立即保存，等用户完成扫码后再标记）
         # 这样用户如果刷新页面仍然可以访问，但token只能用于一次会话
         logger.info(f"Verified relogin token for account: {account_name} ({account_id})")
 
-        return TokenVerifyResponse(
+        return TokenVerifyResponse.model_construct(
             valid=True,
             account_id=account_id,
             account_name=account_name,
@@ -84,71 +100,96 @@ def verify_relogin_token(token: str = Query(..., description="一次性登录令
         logger.exception(f"Error verifying relogin token: {e}")
         raise HTTPException(status_code=500, detail="服务器错误")
 
-    finally:
-        db.close()
-
 
 @router.post("/api/werss-relogin/confirm")
-def confirm_relogin(token: str = Query(..., description="一次性登录令牌")):
+def confirm_relogin(
+    token: str = Query(..., description="一次性登录令牌"),
+    db: Session = Depends(get_db),
+):
     """
     确认重新登录完成
 
     用户完成扫码后调用此接口，标记token为已使用
     """
-    db = SessionLocal()
-    try:
-        one_time_token = db.query(OneTimeToken).filter(
-            OneTimeToken.token == token,
-            OneTimeToken.purpose == "werss_relogin"
-        ).first()
+    if not is_well_formed_token(token):
+        raise HTTPException(status_code=404, detail="令牌不存在")
 
-        if not one_time_token:
+    try:
+        # 查找并标记为已使用：一条 UPDATE ... RETURNING
+        def _mark_used(stored_token: str):
+            return db.execute(
+                update(OneTimeToken)
+                .where(
+                    OneTimeToken.token == stored_token,
+                    OneTimeToken.purpose == "werss_relogin"
+                )
+                .values(is_used=True, used_at=func.timezone("UTC", func.now()))
+                .returning(OneTimeToken.id)
+            ).scalar_one_or_none()
+
+        token_id = _mark_used(hash_token(token))
+        if token_id is None:
+            # 过渡期兼容：旧令牌库里存的是原文（同上，上线满一天后删除）
+            token_id = _mark_used(token)
+
+        if token_id is None:
             raise HTTPException(status_code=404, detail="令牌不存在")
 
-        # 标记为已使用
-        one_time_token.is_used = True
-        one_time_token.used_at = datetime.utcnow()
         db.commit()
 
         logger.info(f"Confirmed relogin for token: {token[:8]}...")
 
         return {"success": True, "message": "重新登录成功"}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error confirming relogin: {e}")
         db.rollback()
         raise HTTPException(status_code=500, detail="服务器错误")
 
-    finally:
-        db.close()
-
 
 @router.get("/api/werss/accounts")
-def get_werss_accounts():
+def get_werss_accounts(
+    limit: int | None = Query(None, ge=1, le=1000, description="每页条数；不传则返回全部"),
+    cursor: int | None = Query(None, description="翻页游标：上一页返回的 next_cursor"),
+    db: Session = Depends(get_db),
+):
     """
-    获取所有WeRSS公众号列表（用于调试）
+    获取WeRSS公众号列表（用于调试）
 
-    返回所有启用了WeRSS的公众号信息
+    返回启用了WeRSS的公众号信息；total 始终是启用WeRSS的公众号总数。
+    传 limit 时按 id 键集分页，next_cursor 为空表示已到最后一页
     """
-    db = SessionLocal()
-    try:
-        accounts = db.query(OfficialAccount).filter(
-            OfficialAccount.is_active == True,
-            OfficialAccount.werss_feed_id.isnot(None)
-        ).all()
-
-        return {
-            "total": len(accounts),
-            "accounts": [
-                {
-                    "id": acc.id,
-                    "name": acc.name,
-                    "werss_feed_id": acc.werss_feed_id,
-                    "last_collection_time": acc.last_collection_time.isoformat() if acc.last_collection_time else None
-                }
-                for acc in accounts
-            ]
-        }
-
-    finally:
-        db.close()
+    # 只取返回的 4 列
+    base = db.query(
+        OfficialAccount.id,
+        OfficialAccount.name,
+        OfficialAccount.werss_feed_id,
+        OfficialAccount.last_collection_time,
+    ).filter(
+        OfficialAccount.is_active == True,
+        OfficialAccount.werss_feed_id.isnot(None)
+    )
+
+    query = base.order_by(OfficialAccount.id)
+    if cursor is not None:
+        query = query.filter(OfficialAccount.id > cursor)
+    if limit is None:
+        rows = query.all()
+        has_more = False
+    else:
+        # 多取一行用来判断是否还有下一页
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+    # 不分页且从头取时行数即总数，省一次 COUNT
+    total = len(rows) if limit is None and cursor is None else base.count()
+    # 直接返回 ORJSONResponse：跳过 FastAPI 对返回值的 jsonable_encoder 逐行转换，
+    # datetime 由 orjson 原生序列化（naive datetime 输出与 isoformat() 一致）
+    return ORJSONResponse({
+        "total": total,
+        "next_cursor": rows[-1].id if has_more else None,
+        "accounts": [acc._asdict() for acc in rows]
+    })
@@ -1,21 +1,25 @@
 from __future__ import annotations
 
-import json
 import os
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 
+import orjson
 from openai import OpenAI
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from shared.database import Article
+from shared.database import Article, ArticleSummaryCache, SessionLocal
 from shared.utils import get_logger
 
 from .guardrails import sanitize_sensitive, strip_unverified_numbers_from_by_the_numbers
 from .nlp import (
-    clean_text,
+    cleaned_article_text,
     extract_number_spans,
     extract_key_snippets,
     finance_keyword_hits,
@@ -29,6 +33,87 @@ from .prompts import coerce_schema_defaults, extract_first_json, smart_brevity_s
 logger = get_logger("daily-briefing-generator")
 
 
+_BJT = timezone(timedelta(hours=8))
+
+
+@lru_cache(maxsize=8192)
+def _bjt_date_str(dt: datetime) -> str:
+    """Naive-UTC datetime -> Beijing YYYY-MM-DD (memoized: the same articles are formatted repeatedly)."""
+    return dt.replace(tzinfo=timezone.utc).astimezone(_BJT).date().isoformat()
+
+
+@lru_cache(maxsize=1)
+def _load_dict_once() -> None:
+    """Load the jieba user dict once per process (generators are rebuilt per run/request)."""
+    load_custom_dictionary()
+
+
+# Complete "focus_topic" string value in a (possibly partial) streamed JSON response.
+_FOCUS_TOPIC_RE = re.compile(r'"focus_topic"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _focus_stream_enabled() -> bool:
+    return (os.getenv("DAILY_FOCUS_STREAM", "True") or "True").lower() == "true"
+
+
+# Bump when the per-article summary prompt changes, so cached summaries are not reused.
+_SUMMARY_PROMPT_VERSION = "v1"
+
+
+def _summary_cache_ttl() -> timedelta:
+    return timedelta(days=int(os.getenv("DAILY_SUMMARY_CACHE_TTL_DAYS", "14") or "14"))
+
+
+def _load_cached_summaries(keys: List[str]) -> Dict[str, str]:
+    """Best-effort: {cache_key: summary} for non-expired entries; empty on any DB error."""
+    if not keys:
+        return {}
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - _summary_cache_ttl()
+        rows = (
+            db.query(ArticleSummaryCache.cache_key, ArticleSummaryCache.summary)
+            .filter(ArticleSummaryCache.cache_key.in_(keys), ArticleSummaryCache.created_at >= cutoff)
+            .all()
+        )
+        return {r.cache_key: r.summary for r in rows}
+    except Exception as e:
+        logger.warning(f"Summary cache read failed: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def _store_cached_summaries(summaries: Dict[str, str], *, model: str) -> None:
+    """Best-effort upsert of fresh summaries; expired entries are pruned in the same transaction."""
+    if not summaries:
+        return
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        db.query(ArticleSummaryCache).filter(ArticleSummaryCache.created_at < now - _summary_cache_ttl()).delete(
+            synchronize_session=False
+        )
+        stmt = pg_insert(ArticleSummaryCache).values(
+            [
+                {"cache_key": k, "summary": v, "model": str(model or "")[:100], "created_at": now}
+                for k, v in summaries.items()
+            ]
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ArticleSummaryCache.cache_key],
+                set_={"summary": stmt.excluded.summary, "created_at": stmt.excluded.created_at},
+            )
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Summary cache write failed: {e}")
+    finally:
+        db.close()
+
+
 @dataclass(frozen=True)
 class DailyBriefingConfig:
     min_finance_kw_hits: int = 2
@@ -58,6 +143,16 @@ class DailyBriefingGenerator:
         "丽水",
     ]
 
+    # Precompiled matchers for _is_focus_too_local_or_narrow (called on every retry attempt).
+    # Headline markers implying county/district-level anchoring; 开发区/新区/园区 are covered by 区.
+    _LOCAL_MARKER_RE = re.compile(r"[县区镇乡]|街道|经开|高新")
+    _BROAD_FRAMING_RE = re.compile(r"全省|浙江|省级")
+    _ZJ_CITY_RE = re.compile("|".join(_ZJ_CITIES))
+    # Policy markers that bump a hotspot candidate when the cluster input must be trimmed.
+    _POLICY_MARK_RE = re.compile(
+        "补贴|补助|津贴|退税|减免|专项债|消费券|以旧换新|报销|医保|社保|托育|研发|专利|高新"
+    )
+
     _COUNTY_EXCLUDE_MARKERS: List[str] = [
         "开发区",
         "新区",
@@ -81,8 +176,8 @@ class DailyBriefingGenerator:
         self.model = model
         self.keywords_model = (keywords_model or os.getenv("QWEN_KEYWORDS_MODEL", "qwen-flash")).strip() or "qwen-flash"
         self.cfg = config or DailyBriefingConfig()
-        # load NLP resources (no-op if jieba missing)
-        load_custom_dictionary()
+        # load NLP resources once per process (no-op if jieba missing)
+        _load_dict_once()
 
     def generate(
         self,
@@ -125,6 +220,21 @@ class DailyBriefingGenerator:
         raw = ""
         obj_try: Dict[str, Any] | None = None
         last_reason = ""
+        # identical across attempts; only the user-side extra instructions change between retries
+        system_prompt = smart_brevity_system_prompt(target_date)
+        user_head, user_material = self._smart_brevity_user_parts(
+            per_article,
+            focus_type=focus_type,
+            focus_style=focus_style,
+            lead_variant=lead_variant,
+            recent_focus_topics=recent_topics,
+        )
+        id2src_fin = self._index_sources(sources_fin)
+        # Rejected-but-complete outputs, ranked so a fully failed loop keeps the least bad one.
+        reject_rank = {"too_local": 1, "semantic_dup": 2, "no_topic": 3}
+        best_raw, best_rank = "", 99
+        prev_ft, prev_reason = None, None
+        rejected_topics: List[str] = []
         for attempt in range(3):
             extra = ""
             if attempt >= 1 and last_reason == "too_local":
@@ -143,19 +253,36 @@ class DailyBriefingGenerator:
                     "\n重要：你仍在重复近3天已用焦点（语义相近也算重复）。"
                     "请务必选择不同主题，并尽量使用不同来源文章支撑。\n"
                 ) + extra
-            raw = self._call_llm(
-                system_prompt=smart_brevity_system_prompt(target_date),
-                user_prompt=self._smart_brevity_user_from_summaries(
-                    per_article,
-                    focus_type=focus_type,
-                    focus_style=focus_style,
-                    lead_variant=lead_variant,
-                    recent_focus_topics=recent_topics,
-                    extra_instructions=extra,
-                ),
-                temperature=0.2,
-                timeout=120,
-            ) or ""
+            if rejected_topics:
+                extra += f"本次 focus_topic 必须不同于：{'、'.join(rejected_topics)}\n"
+            user_prompt = user_head + extra + user_material
+            cleared_topic = None
+            # Early cancel only when another attempt follows: the last attempt's output is used as-is.
+            if attempt < 2 and recent_topics and _focus_stream_enabled():
+                raw, cleared_topic, early_dup = self._call_llm_focus_stream(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=0.2,
+                    timeout=120,
+                    recent_topics=recent_topics,
+                )
+                raw = raw or ""
+                if early_dup:
+                    last_reason = "semantic_dup"
+                    m = _FOCUS_TOPIC_RE.search(raw)
+                    ft = m.group(1).strip() if m else ""
+                    if ft and ft not in rejected_topics:
+                        rejected_topics.append(ft)
+                    # no complete output to fall back on yet, so never stop the loop here
+                    prev_ft, prev_reason = ft, last_reason
+                    continue
+            else:
+                raw = self._call_llm(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=0.2,
+                    timeout=120,
+                ) or ""
             if not raw:
                 break
             obj_try = extract_first_json(raw)
@@ -163,15 +290,25 @@ class DailyBriefingGenerator:
                 break
             ft = str(obj_try.get("focus_topic") or "").strip()
             if not ft:
-                continue
-            if self._is_topic_semantic_duplicate(topic=ft, recent_topics=recent_topics):
+                last_reason = "no_topic"
+            elif ft != cleared_topic and self._is_topic_semantic_duplicate(topic=ft, recent_topics=recent_topics):
                 last_reason = "semantic_dup"
-                continue
-            if self._is_focus_too_local_or_narrow(obj_try=obj_try, sources_for_prompt=sources_fin):
+            elif self._is_focus_too_local_or_narrow(obj_try=obj_try, sources_for_prompt=sources_fin, id2src=id2src_fin):
                 last_reason = "too_local"
-                continue
-            last_reason = ""
-            break
+            else:
+                last_reason = ""
+                break
+            if reject_rank[last_reason] <= best_rank:
+                best_raw, best_rank = raw, reject_rank[last_reason]
+            if ft and ft not in rejected_topics:
+                rejected_topics.append(ft)
+            # Same topic rejected for the same reason twice in a row: another call is unlikely to converge.
+            if ft == prev_ft and last_reason == prev_reason:
+                break
+            prev_ft, prev_reason = ft, last_reason
+        if last_reason and best_raw:
+            # every attempt was rejected (or the last one was cancelled mid-stream): keep the least bad output
+            raw = best_raw
         if not raw:
             return None
         if not raw:
@@ -330,17 +467,12 @@ class DailyBriefingGenerator:
             url = str(getattr(a, "article_url", "") or "").strip()
             if not url or url in existing_urls:
                 continue
-            account_name = ""
-            try:
-                if getattr(a, "account", None) and getattr(a.account, "name", None):
-                    account_name = a.account.name
-            except Exception:
-                account_name = ""
+            account = getattr(a, "account", None)
             title = str(getattr(a, "title", "") or "").strip()
             sources_out.append(
                 {
                     "id": next_id,
-                    "account": account_name or "",
+                    "account": (getattr(account, "name", None) or "") if account is not None else "",
                     "title": title or "",
                     "url": url,
                     "date": self._date_str_for_article(a),
@@ -364,8 +496,7 @@ class DailyBriefingGenerator:
         if not isinstance(dt, datetime):
             return ""
         try:
-            bj = dt.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=8)))
-            return bj.date().isoformat()
+            return _bjt_date_str(dt)
         except Exception:
             return ""
 
@@ -425,6 +556,9 @@ class DailyBriefingGenerator:
         tag_sum_th = max(1, min(6, int(tag_sum_th)))
 
         cluster_items: List[Dict[str, Any]] = []
+        # tag sums computed once here are reused by the trimming score below (items go to the LLM as-is,
+        # so the sum is kept alongside rather than on the item)
+        tag_sums: Dict[int, int] = {}
         for sid, a in source_articles.items():
             aid = int(getattr(a, "id", 0) or 0)
             if aid <= 0:
@@ -436,6 +570,7 @@ class DailyBriefingGenerator:
             tag_sum = int(tags0.get("finance") or 0) + int(tags0.get("minsheng") or 0) + int(tags0.get("tech") or 0)
             if tag_sum < tag_sum_th:
                 continue
+            tag_sums[int(sid)] = tag_sum
             cluster_items.append(
                 {
                     "source_id": int(sid),
@@ -457,12 +592,9 @@ class DailyBriefingGenerator:
             max_cluster_items = 120
         max_cluster_items = max(40, min(220, int(max_cluster_items)))
         if len(cluster_items) > max_cluster_items:
-            policy_marks = ("补贴", "补助", "津贴", "退税", "减免", "专项债", "消费券", "以旧换新", "报销", "医保", "社保", "托育", "研发", "专利", "高新")
-
             def _score_item(it: Dict[str, Any]) -> float:
-                tags = it.get("tags") if isinstance(it.get("tags"), dict) else {}
-                tag_sum = float(int(tags.get("finance") or 0) + int(tags.get("minsheng") or 0) + int(tags.get("tech") or 0))
                 sid = int(it.get("source_id") or 0)
+                tag_sum = float(tag_sums.get(sid, 0))
                 a = source_articles.get(sid)
                 dt = getattr(a, "published_at", None)
                 rec = 0.0
@@ -473,11 +605,11 @@ class DailyBriefingGenerator:
                         days = 9
                     rec = 3.0 if days <= 0 else (2.0 if days == 1 else (1.0 if days == 2 else 0.2))
                 title = str(it.get("title") or "")
-                mark = 1.2 if any(m in title for m in policy_marks) else 0.0
+                mark = 1.2 if self._POLICY_MARK_RE.search(title) else 0.0
                 return tag_sum * 10.0 + rec + mark
 
-            cluster_items.sort(key=_score_item, reverse=True)
-            cluster_items = cluster_items[:max_cluster_items]
+            # top-k selection (same order as a stable descending sort, truncated)
+            cluster_items = heapq.nlargest(max_cluster_items, cluster_items, key=_score_item)
 
         # LLM clustering & naming
         events = cluster_recent_hotspots_llm(client=self.client, model=self.keywords_model, items=cluster_items, target_n=top_k)
@@ -485,36 +617,40 @@ class DailyBriefingGenerator:
             return []
 
         # Local hotness score: coverage + breadth + recency (display only)
-        def _hotness(source_ids: List[int]) -> Tuple[int, int, str]:
-            sids = [int(x) for x in (source_ids or []) if isinstance(x, int) or str(x).isdigit()]
-            sids = [int(x) for x in sids if int(x) > 0]
-            docs = len(set(sids))
-            accs = len(set([str(sid_meta.get(int(sid), {}).get("account") or "") for sid in sids if str(sid_meta.get(int(sid), {}).get("account") or "")]))
-            # last_seen
+        def _hotness(source_ids: List[int]) -> Tuple[int, int, int, str]:
+            # one pass over the unique ids: docs, distinct accounts, latest published article
+            uniq = {sid for sid in source_ids if sid > 0}
+            accounts: set[str] = set()
             last_dt = None
-            last_sid = None
-            for sid in sids:
-                dt = getattr(source_articles.get(int(sid)), "published_at", None)
+            last_a = None
+            for sid in uniq:
+                acc = (sid_meta.get(sid) or {}).get("account") or ""
+                if acc:
+                    accounts.add(acc)
+                a = source_articles.get(sid)
+                dt = getattr(a, "published_at", None)
                 if isinstance(dt, datetime) and (last_dt is None or dt > last_dt):
                     last_dt = dt
-                    last_sid = sid
-            last_seen = self._date_str_for_article(source_articles.get(int(last_sid)) if last_sid else None)
+                    last_a = a
+            docs = len(uniq)
+            accs = len(accounts)
+            last_seen = self._date_str_for_article(last_a)
             # map to 0..100
             score = int(min(100, 20 + docs * 18 + accs * 10))
-            return score, docs, last_seen
+            return score, docs, accs, last_seen
 
         out: List[Dict[str, Any]] = []
         for ev in events:
             sids = ev.get("source_ids") or []
             if not isinstance(sids, list) or len(sids) < 2:
                 continue
-            hot, docs, last_seen = _hotness([int(x) for x in sids if isinstance(x, int) or str(x).isdigit()])
-            accs = len(set([str(sid_meta.get(int(sid), {}).get("account") or "") for sid in sids if str(sid_meta.get(int(sid), {}).get("account") or "")]))
+            ids = [int(x) for x in sids if isinstance(x, int) or str(x).isdigit()]
+            hot, docs, accs, last_seen = _hotness(ids)
             out.append(
                 {
                     "event": str(ev.get("event") or ""),
                     "hotness": int(hot),
-                    "source_ids": [int(x) for x in sids if isinstance(x, int) or str(x).isdigit()][:6],
+                    "source_ids": ids[:6],
                     "coverage_docs": int(docs),
                     "coverage_accounts": int(accs),
                     "last_seen": str(last_seen or ""),
@@ -526,11 +662,30 @@ class DailyBriefingGenerator:
         out.sort(key=lambda x: int(x.get("hotness") or 0), reverse=True)
         return out[:top_k]
 
-    def _is_focus_too_local_or_narrow(self, *, obj_try: Dict[str, Any], sources_for_prompt: List[Dict[str, Any]]) -> bool:
+    @staticmethod
+    def _index_sources(sources: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """{source id: source dict}; entries without a usable id are skipped."""
+        id2src: Dict[int, Dict[str, Any]] = {}
+        for s in sources or []:
+            if isinstance(s, dict) and s.get("id"):
+                try:
+                    id2src[int(s["id"])] = s
+                except Exception:
+                    pass
+        return id2src
+
+    def _is_focus_too_local_or_narrow(
+        self,
+        *,
+        obj_try: Dict[str, Any],
+        sources_for_prompt: List[Dict[str, Any]],
+        id2src: Optional[Dict[int, Dict[str, Any]]] = None,
+    ) -> bool:
         """
         Enforce product positioning:
         - Title should not be county/district/town level. Prefer province-wide or at least city-level framing.
         - For common_issue, citations should span multiple prefecture-level cities (best-effort).
+        `id2src` may be passed precomputed (generate() builds it once for all retry attempts).
         """
         if not isinstance(obj_try, dict):
             return False
@@ -543,13 +698,12 @@ class DailyBriefingGenerator:
             title = ""
         visual_focus = str(obj_try.get("visual_focus") or "").strip()
 
-        # Markers implying county/district-level anchoring in headline.
-        local_markers = ["县", "区", "镇", "乡", "街道", "开发区", "新区", "园区", "经开", "高新"]
-        allow_broad = any(x in title for x in ["全省", "浙江", "省级"])
-        has_city = any(c in title for c in self._ZJ_CITIES)
+        has_local = bool(title) and self._LOCAL_MARKER_RE.search(title) is not None
+        allow_broad = self._BROAD_FRAMING_RE.search(title) is not None
+        has_city = self._ZJ_CITY_RE.search(title) is not None
 
         # If headline contains a local marker, reject unless it is explicitly province-level framing.
-        if title and any(m in title for m in local_markers) and not allow_broad:
+        if has_local and not allow_broad:
             return True
 
         # For common_issue: ensure multi-city coverage in citations (best-effort).
@@ -569,21 +723,13 @@ class DailyBriefingGenerator:
             except Exception:
                 cited_ids = []
 
-            id2src: Dict[int, Dict[str, Any]] = {}
-            for s in sources_for_prompt or []:
-                if isinstance(s, dict) and s.get("id"):
-                    try:
-                        id2src[int(s["id"])] = s
-                    except Exception:
-                        pass
+            if id2src is None:
+                id2src = self._index_sources(sources_for_prompt)
 
             cities: set[str] = set()
             for sid in cited_ids:
                 s = id2src.get(int(sid)) or {}
-                blob = f"{s.get('account') or ''} {s.get('title') or ''}"
-                for c in self._ZJ_CITIES:
-                    if c in blob:
-                        cities.add(c)
+                cities.update(self._ZJ_CITY_RE.findall(f"{s.get('account') or ''} {s.get('title') or ''}"))
             # If we cannot detect at least 2 cities and title isn't broadly framed, treat as too narrow.
             if len(cities) < 2 and not allow_broad:
                 # If title is city-level but common_issue still only cites that city, it's still too narrow.
@@ -593,7 +739,7 @@ class DailyBriefingGenerator:
 
         # For high_impact_event: allow city-level or province-level; reject if neither and looks local.
         if visual_focus == "high_impact_event":
-            if title and any(m in title for m in local_markers) and not (allow_broad or has_city):
+            if has_local and not (allow_broad or has_city):
                 return True
 
         return False
@@ -608,8 +754,14 @@ class DailyBriefingGenerator:
         Summary-only pipeline (cheaper):
         For each filtered article, generate 1-sentence summary (<=80 chars).
         Output: [{"source_id":sid, "title":..., "summary":...}]
+
+        Summaries are cached in article_summary_cache keyed by content hash; only misses call the LLM,
+        several articles per request. Calls are I/O-bound, so batches run on a bounded thread pool;
+        output keeps `sources` order.
         """
-        out: List[Dict[str, Any]] = []
+        # ORM attributes are read here on the caller's thread (the Session is not thread-safe);
+        # workers only see plain strings.
+        items: List[Tuple[int, str, str, str]] = []
         for s in sources:
             try:
                 sid = int(s.get("id"))
@@ -621,30 +773,45 @@ class DailyBriefingGenerator:
             if not a:
                 continue
             title = str(getattr(a, "title", "") or "").strip()
-            body = str(getattr(a, "content", "") or "").strip()
-            clip = clean_text(body)[: self.cfg.per_article_chars]
-            # Keep prompt cheap. Summary must be grounded in title/body.
-            system = (
-                "你是浙江财政晨报系统的“逐篇总结器”。\n"
-                "请对输入文章生成一句话总结（<=80字），不得编造事实。\n"
-                "只输出严格JSON：{\"summary\":\"...\"}\n"
-            )
-            user = f"[{sid}] 标题：{title}\n正文：{clip}\n"
-            summary = ""
-            try:
-                resp = self.client.chat.completions.create(
-                    model=self.keywords_model,
-                    messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-                    temperature=0.1,
-                    timeout=45,
-                )
-                txt = (resp.choices[0].message.content or "").strip()
-                obj = extract_first_json(txt) or {}
-                summary = str(obj.get("summary") or "").strip()
-            except Exception as e:
-                logger.warning(f"Per-article summary failed: id={sid}, model={self.keywords_model}, err={e}")
-                summary = ""
+            clip = cleaned_article_text(getattr(a, "id", None), getattr(a, "content", None))[: self.cfg.per_article_chars]
+            key = hashlib.sha256(f"{self.keywords_model}|{_SUMMARY_PROMPT_VERSION}|{title}|{clip}".encode("utf-8")).hexdigest()
+            items.append((sid, title, clip, key))
+        if not items:
+            return []
 
+        cached = _load_cached_summaries([key for *_, key in items])
+        misses = [it for it in items if it[3] not in cached]
+
+        fresh: Dict[str, str] = {}
+        llm_calls = 0
+        if misses:
+            # Verbatim reposts (same cleaned body across accounts) are summarized once and shared.
+            groups: Dict[bytes, List[Tuple[int, str, str, str]]] = {}
+            for it in misses:
+                gk = hashlib.sha1(it[2].encode("utf-8")).digest() if it[2] else it[3].encode("ascii")
+                groups.setdefault(gk, []).append(it)
+            reps = [g[0] for g in groups.values()]
+            llm_calls = len(reps)
+
+            batches = self._batch_for_summary(reps)
+            workers = max(1, min(len(batches), int(os.getenv("DAILY_SUMMARIZE_CONCURRENCY", "8") or "8")))
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                for res in ex.map(self._summarize_batch, batches):
+                    fresh.update(res)
+            for g in groups.values():
+                shared = fresh.get(g[0][3])
+                if shared:
+                    for it in g[1:]:
+                        fresh[it[3]] = shared
+            _store_cached_summaries(fresh, model=self.keywords_model)
+        logger.info(
+            f"Per-article summaries: total={len(items)}, cached={len(items) - len(misses)}, "
+            f"unique_misses={llm_calls}"
+        )
+
+        out: List[Dict[str, Any]] = []
+        for sid, title, clip, key in items:
+            summary = cached.get(key) or fresh.get(key) or ""
             if not summary:
                 # Fallback: use key snippets / first sentence from cleaned body, then fallback to title.
                 try:
@@ -654,7 +821,6 @@ class DailyBriefingGenerator:
                     summary = ""
             if not summary:
                 summary = title[:80]
-
             out.append(
                 {
                     "source_id": sid,
@@ -663,7 +829,102 @@ class DailyBriefingGenerator:
                 }
             )
         return out
-    def _smart_brevity_user_from_summaries(
+
+    @staticmethod
+    def _batch_for_summary(items: List[Tuple[int, str, str, str]]) -> List[List[Tuple[int, str, str, str]]]:
+        """Group articles into multi-document summary requests, bounded by count and total clip length."""
+        try:
+            max_n = int(os.getenv("DAILY_SUMMARIZE_BATCH", "8") or "8")
+        except Exception:
+            max_n = 8
+        max_n = max(1, min(16, max_n))
+        max_chars = 12000
+
+        batches: List[List[Tuple[int, str, str, str]]] = []
+        cur: List[Tuple[int, str, str, str]] = []
+        cur_chars = 0
+        for it in items:
+            n = len(it[2])
+            if cur and (len(cur) >= max_n or cur_chars + n > max_chars):
+                batches.append(cur)
+                cur, cur_chars = [], 0
+            cur.append(it)
+            cur_chars += n
+        if cur:
+            batches.append(cur)
+        return batches
+
+    def _summarize_batch(self, batch: List[Tuple[int, str, str, str]]) -> Dict[str, str]:
+        """
+        One LLM call for several articles: {cache_key: summary}.
+        Articles the model skips (or a malformed response) fall back to one-by-one calls.
+        """
+        if len(batch) == 1:
+            sid, title, clip, key = batch[0]
+            summary = self._summarize_one(sid, title, clip)
+            return {key: summary} if summary else {}
+
+        system = (
+            "你是浙江财政晨报系统的“逐篇总结器”。\n"
+            "请对输入的每篇文章分别生成一句话总结（<=80字），不得编造事实，不得混用不同文章的内容。\n"
+            "只输出严格JSON：{\"summaries\":[{\"source_id\":1,\"summary\":\"...\"}]}，逐条对应 source_id。\n"
+        )
+        user = "".join(f"[{sid}] 标题：{title}\n正文：{clip}\n---\n" for sid, title, clip, _ in batch)
+        by_sid: Dict[int, str] = {}
+        try:
+            resp = self.client.chat.completions.create(
+                model=self.keywords_model,
+                messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+                temperature=0.1,
+                timeout=90,
+            )
+            obj = extract_first_json((resp.choices[0].message.content or "").strip()) or {}
+            arr = obj.get("summaries")
+            if isinstance(arr, list):
+                for it in arr:
+                    if not isinstance(it, dict):
+                        continue
+                    try:
+                        sid2 = int(it.get("source_id") or 0)
+                    except Exception:
+                        continue
+                    summary = str(it.get("summary") or "").strip()
+                    if sid2 > 0 and summary:
+                        by_sid[sid2] = summary
+        except Exception as e:
+            logger.warning(f"Batched summary failed: size={len(batch)}, model={self.keywords_model}, err={e}")
+
+        out: Dict[str, str] = {}
+        for sid, title, clip, key in batch:
+            summary = by_sid.get(sid) or self._summarize_one(sid, title, clip)
+            if summary:
+                out[key] = summary
+        return out
+
+    def _summarize_one(self, sid: int, title: str, clip: str) -> str:
+        """One-sentence LLM summary for a single article; empty string on failure."""
+        # Keep prompt cheap. Summary must be grounded in title/body.
+        system = (
+            "你是浙江财政晨报系统的“逐篇总结器”。\n"
+            "请对输入文章生成一句话总结（<=80字），不得编造事实。\n"
+            "只输出严格JSON：{\"summary\":\"...\"}\n"
+        )
+        user = f"[{sid}] 标题：{title}\n正文：{clip}\n"
+        try:
+            resp = self.client.chat.completions.create(
+                model=self.keywords_model,
+                messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+                temperature=0.1,
+                timeout=45,
+            )
+            txt = (resp.choices[0].message.content or "").strip()
+            obj = extract_first_json(txt) or {}
+            return str(obj.get("summary") or "").strip()
+        except Exception as e:
+            logger.warning(f"Per-article summary failed: id={sid}, model={self.keywords_model}, err={e}")
+            return ""
+
+    def _smart_brevity_user_parts(
         self,
         per_article: List[Dict[str, Any]],
         *,
@@ -671,10 +932,11 @@ class DailyBriefingGenerator:
         focus_style: str,
         lead_variant: str,
         recent_focus_topics: List[str],
-        extra_instructions: str = "",
-    ) -> str:
+    ) -> Tuple[str, str]:
         """
         Step 3 input: only per-article summaries, to reduce cost.
+        Returns (head, material); the per-attempt retry instructions go between them,
+        so the invariant parts are built once per generate() call.
         """
         lines: List[str] = []
         for it in per_article:
@@ -723,16 +985,15 @@ class DailyBriefingGenerator:
                 "- 今日必须选择不同的 focus_topic（不重复/不高度重叠）。\n"
             )
 
-        return (
+        head = (
             "请基于以下“逐篇总结”生成《浙江财政信息摘要》JSON。\n"
             "注意：你只能引用方括号里的编号作为 citations；不要编造来源。\n"
             f"今日焦点类型：{focus_type}\n"
             f"{style_hint}\n"
             f"{variant_hint}\n\n"
             f"{dedupe}"
-            f"{extra_instructions}"
-            f"{material}\n"
         )
+        return head, f"{material}\n"
 
     def _is_topic_semantic_duplicate(self, *, topic: str, recent_topics: List[str]) -> bool:
         """
@@ -752,7 +1013,7 @@ class DailyBriefingGenerator:
             "判断“候选主题”是否与“历史主题列表”语义相近（同一政策/同一补贴/同一领域同一事件），相近则视为重复。\n"
             "只输出严格JSON：{\"duplicate\":true|false}\n"
         )
-        user = json.dumps({"candidate": t, "history": r[:10]}, ensure_ascii=False)
+        user = orjson.dumps({"candidate": t, "history": r[:10]}).decode()
         try:
             resp = self.client.chat.completions.create(
                 model=self.keywords_model,
@@ -880,7 +1141,7 @@ class DailyBriefingGenerator:
             except Exception:
                 pub = ""
 
-            body = clean_text(a.content or "")
+            body = cleaned_article_text(getattr(a, "id", None), a.content)
             if len(body) > per_article:
                 # keep head + key snippets
                 head = body[: int(per_article * 0.7)].rstrip()
@@ -932,6 +1193,68 @@ class DailyBriefingGenerator:
             logger.error(f"Daily briefing LLM call failed: {e}")
             return None
 
+    def _call_llm_focus_stream(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        timeout: int,
+        recent_topics: List[str],
+    ) -> Tuple[str | None, str | None, bool]:
+        """
+        Streaming variant of _call_llm for the focus retry loop.
+        focus_topic is the second key of the output schema, so it is checked for semantic duplication
+        as soon as it has streamed in; a duplicate aborts the generation instead of waiting for the
+        full briefing. Returns (raw, topic_already_cleared, rejected_early).
+        Falls back to the non-streaming call if the stream cannot be opened.
+        """
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=temperature,
+                timeout=timeout,
+                stream=True,
+            )
+        except Exception as e:
+            logger.warning(f"Daily briefing LLM stream failed to open, falling back: {e}")
+            return self._call_llm(system_prompt=system_prompt, user_prompt=user_prompt, temperature=temperature, timeout=timeout), None, False
+
+        parts: List[str] = []
+        cleared: str | None = None
+        checked = False
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                parts.append(delta)
+                if checked:
+                    continue
+                m = _FOCUS_TOPIC_RE.search("".join(parts))
+                if not m:
+                    continue
+                checked = True
+                topic = m.group(1).strip()
+                if not topic:
+                    continue
+                if self._is_topic_semantic_duplicate(topic=topic, recent_topics=recent_topics):
+                    logger.info(f"Focus topic rejected mid-stream as duplicate: {topic}")
+                    return "".join(parts), None, True
+                cleared = topic
+        except Exception as e:
+            logger.error(f"Daily briefing LLM stream failed: {e}")
+            return None, None, False
+        finally:
+            stream.response.close()
+        return "".join(parts).strip(), cleared, False
+
     def _normalize_sources_and_citations(self, *, obj: Dict[str, Any], sources_for_prompt: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Keep only cited source ids; remap to 1..N; update sources and citations arrays.
@@ -1,19 +1,19 @@
 from __future__ import annotations
 
-import json
 import os
 import re
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import orjson
 from openai import OpenAI
 
 from shared.database import SessionLocal
 from shared.database.models import Article, ArticleOneLiner
 from shared.utils import get_logger
 
-from .nlp import clean_text, extract_key_snippets, EXTENDED_KEYWORDS
+from .nlp import cleaned_article_text, extract_key_snippets, EXTENDED_KEYWORDS
 from .prompts import extract_first_json
 
 logger = get_logger("daily-briefing-hotspots")
@@ -33,8 +33,7 @@ def _now_utc_naive() -> datetime:
 
 def _clip_for_llm(a: Article, *, max_chars: int = 1600) -> str:
     title = str(getattr(a, "title", "") or "").strip()
-    body = str(getattr(a, "content", "") or "").strip()
-    body2 = clean_text(body)
+    body2 = cleaned_article_text(getattr(a, "id", None), getattr(a, "content", None))
     # Use a few key snippets to keep signal without paying full text cost
     try:
         snips = extract_key_snippets(body2, max_snippets=6)
@@ -154,7 +153,7 @@ def get_or_compute_one_liners(
                 items.append({"n": idx, "article_id": aid, "text": clip})
             if not items:
                 return {}
-            user = json.dumps({"items": items}, ensure_ascii=False)
+            user = orjson.dumps({"items": items}).decode()
             # Ask model to output list aligned to article_id to avoid ordering ambiguity
             system2 = system + "\n补充：请输出列表，逐条对应 article_id。输出格式：{\"items\":[{\"article_id\":1,...}]}\n"
             resp = client.chat.completions.create(
@@ -308,7 +307,7 @@ def cluster_recent_hotspots_llm(
         "输出格式：{\"events\":[{\"event\":\"...\",\"source_ids\":[1,2],\"why_hot\":\"<=12字\",\"category\":\"welfare|fiscal|consumption|tech|other\"}]}\n"
     )
 
-    user = json.dumps({"target_n": target_n, "items": items}, ensure_ascii=False)
+    user = orjson.dumps({"target_n": target_n, "items": items}).decode()
     resp = client.chat.completions.create(
         model=model,
         messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 import re
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence, Tuple
@@ -168,6 +169,35 @@ def clean_text(text: str) -> str:
     return t.strip()
 
 
+# Per-article cleaned text: the same Article is cleaned by the hotspot one-liners, the
+# per-article summaries and the material builder within one run. Keyed by id + content
+# hash (edited content misses), bounded so long-lived workers don't accumulate bodies.
+_CLEANED_CACHE_MAX = 1024
+_cleaned_cache: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+
+
+def cleaned_article_text(article_id: Optional[int], content: Optional[str]) -> str:
+    body = str(content or "").strip()
+    if not article_id:
+        return clean_text(body)
+    key = (int(article_id), hash(body))
+    hit = _cleaned_cache.get(key)
+    if hit is not None:
+        _cleaned_cache.move_to_end(key)
+        return hit
+    out = clean_text(body)
+    _cleaned_cache[key] = out
+    if len(_cleaned_cache) > _CLEANED_CACHE_MAX:
+        _cleaned_cache.popitem(last=False)
+    return out
+
+
+_FOCUS_BRACKET_MARKER_RE = re.compile(r"【\s*(?:为何重要|为什么重要|大局)\s*】")
+_FOCUS_WHY_PREFIX_RE = re.compile(r"^\s*(?:为何重要|为什么重要)\s*[:：]\s*")
+_FOCUS_BIG_PREFIX_RE = re.compile(r"^\s*(?:大局)\s*[:：]\s*")
+_WS_RE = re.compile(r"\s+")
+
+
 def strip_focus_markers(text: str) -> str:
     """
     Remove legacy section markers like:
@@ -179,12 +209,12 @@ def strip_focus_markers(text: str) -> str:
         return ""
     t = text.strip()
     # remove bracket markers anywhere
-    t = re.sub(r"【\s*(?:为何重要|为什么重要|大局)\s*】", "", t)
+    t = _FOCUS_BRACKET_MARKER_RE.sub("", t)
     # remove leading prefixes (with optional spaces)
-    t = re.sub(r"^\s*(?:为何重要|为什么重要)\s*[:：]\s*", "", t)
-    t = re.sub(r"^\s*(?:大局)\s*[:：]\s*", "", t)
+    t = _FOCUS_WHY_PREFIX_RE.sub("", t)
+    t = _FOCUS_BIG_PREFIX_RE.sub("", t)
     # collapse whitespace
-    t = re.sub(r"\s+", " ", t).strip()
+    t = _WS_RE.sub(" ", t).strip()
     return t
 
 
@@ -4,6 +4,8 @@ import json
 from datetime import date
 from typing import Any, Dict, List
 
+import orjson
+
 
 def smart_brevity_system_prompt(target_date: date) -> str:
     """
@@ -105,6 +107,9 @@ def coerce_schema_defaults(obj: Dict[str, Any], target_date: date) -> Dict[str,
     return out
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
 def extract_first_json(text: str) -> Dict[str, Any] | None:
     if not isinstance(text, str):
         return None
@@ -116,16 +121,25 @@ def extract_first_json(text: str) -> Dict[str, Any] | None:
         s = s.replace("```json", "```").replace("```JSON", "```")
         s = s.strip("`").strip()
     l = s.find("{")
-    r = s.rfind("}")
-    if l == -1 or r == -1 or r <= l:
+    if l == -1:
         return None
-    js = s[l : r + 1]
+    # Common case: the text is exactly one JSON object (orjson parses it fastest).
+    r = s.rfind("}")
+    if r > l:
+        try:
+            obj = orjson.loads(s[l : r + 1])
+            if isinstance(obj, dict):
+                return obj
+        except orjson.JSONDecodeError:
+            pass
+    # raw_decode parses the first complete object and ignores trailing text
+    # (e.g. a note after the JSON that itself contains braces)
     try:
-        obj = json.loads(js)
+        obj, _ = _JSON_DECODER.raw_decode(s, l)
         if isinstance(obj, dict):
             return obj
-        return None
-    except Exception:
-        return None
+    except ValueError:
+        pass
+    return None
 
 
@@ -0,0 +1,37 @@
+"""
+验证邮件发送队列
+
+API 只把待发邮件 RPUSH 到 Redis 列表，由独立的 email-worker 限速消费；
+Redis 不可用时返回 False，由调用方退回进程内 BackgroundTasks 直接发送
+"""
+import json
+
+from redis.exceptions import RedisError
+
+from shared.utils import get_logger, get_redis_client
+
+logger = get_logger("email-queue")
+
+VERIFY_QUEUE_KEY = "zpulse:email:verify"
+# 重试次数用尽的邮件停放在这里，便于人工排查/重新入队
+VERIFY_DEAD_KEY = "zpulse:email:verify:dead"
+
+
+def enqueue_verification_email(email: str, token: str) -> bool:
+    """
+    验证邮件入队
+
+    Args:
+        email: 收件人邮箱
+        token: 原始验证令牌（库里只存摘要，令牌本身只随邮件发出）
+
+    Returns:
+        是否成功入队
+    """
+    payload = json.dumps({"email": email, "token": token})
+    try:
+        get_redis_client().rpush(VERIFY_QUEUE_KEY, payload)
+    except RedisError as e:
+        logger.warning(f"Failed to enqueue verification email for {email}: {e}")
+        return False
+    return True
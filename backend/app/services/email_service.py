@@ -1,6 +1,8 @@
 """
 邮件发送服务 - 支持SendGrid和Brevo（原Sendinblue）
 """
+import asyncio
+from functools import lru_cache
 from typing import Optional
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
@@ -20,10 +22,14 @@ def _is_blank(value: Optional[str]) -> bool:
     return value is None or str(value).strip() == ""
 
 
+@lru_cache(maxsize=1)
 def email_config_status() -> tuple[bool, str]:
     """
     检查邮件服务是否已正确配置。
 
+    配置来自进程启动时加载的 settings，运行期间不变，结果缓存；
+    修改配置后需重启进程（或调用 email_config_status.cache_clear()）。
+
     Returns:
         (ok, reason)  ok=True 表示可发送；否则 reason 描述缺失项/错误。
     """
@@ -151,7 +157,7 @@ def _get_email_client():
         raise ValueError(f"Unsupported email provider: {provider}. Supported: sendgrid, brevo, mailgun")
 
 
-async def send_verification_email(email: str, token: str):
+async def send_verification_email(email: str, token: str) -> bool:
     """
     发送验证邮件（Double Opt-In）
     支持SendGrid、Brevo和Mailgun
@@ -159,12 +165,15 @@ async def send_verification_email(email: str, token: str):
     Args:
         email: 收件人邮箱
         token: 验证令牌
+
+    Returns:
+        是否发送成功（email-worker 据此决定是否重试）
     """
     try:
         ok, reason = email_config_status()
         if not ok:
             logger.error(f"Email not configured, skip sending verification email: {reason}")
-            return
+            return False
 
         verification_url = f"{settings.WEB_URL}/api/subscribe/verify/{token}"
         
@@ -187,7 +196,8 @@ async def send_verification_email(email: str, token: str):
                 subject="请确认您的订阅 - Z-Pulse 财政晨报",
                 html_content=Content("text/html", html_content)
             )
-            response = client.send(message)
+            # SendGrid/Brevo SDK 都是同步阻塞 HTTP 调用：放到线程里执行，不阻塞事件循环
+            response = await asyncio.to_thread(client.send, message)
             logger.info(f"Verification email sent via SendGrid to {email}, status: {response.status_code}")
         
         elif provider == "brevo_sdk":
@@ -201,7 +211,7 @@ async def send_verification_email(email: str, token: str):
                 subject="请确认您的订阅 - Z-Pulse 财政晨报",
                 html_content=html_content
             )
-            response = client.send_transac_email(send_smtp_email)
+            response = await asyncio.to_thread(client.send_transac_email, send_smtp_email)
             message_id = getattr(response, "message_id", None)
             logger.info(f"Verification email sent via Brevo(SDK) to {email}, message_id: {message_id}")
 
@@ -215,24 +225,26 @@ async def send_verification_email(email: str, token: str):
             logger.info(f"Verification email sent via Brevo(REST) to {email}, resp: {data}")
         
         elif provider == "mailgun":
-            import requests
-            response = requests.post(
-                f"https://api.mailgun.net/v3/{client['domain']}/messages",
-                auth=("api", client["api_key"]),
-                data={
-                    "from": f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM}>",
-                    "to": email,
-                    "subject": "请确认您的订阅 - Z-Pulse 财政晨报",
-                    "html": html_content
-                }
-            )
+            async with httpx.AsyncClient(timeout=httpx.Timeout(20.0, connect=10.0)) as http_client:
+                response = await http_client.post(
+                    f"https://api.mailgun.net/v3/{client['domain']}/messages",
+                    auth=("api", client["api_key"]),
+                    data={
+                        "from": f"{settings.EMAIL_FROM_NAME} <{settings.EMAIL_FROM}>",
+                        "to": email,
+                        "subject": "请确认您的订阅 - Z-Pulse 财政晨报",
+                        "html": html_content
+                    }
+                )
             response.raise_for_status()
             logger.info(f"Verification email sent via Mailgun to {email}, status: {response.status_code}")
+
+        return True
         
     except Exception as e:
         # 后台任务失败不应让接口“假成功”，这里记录堆栈并吞掉异常
         logger.exception(f"Failed to send verification email to {email}: {str(e)}")
-        return
+        return False
 
 
 async def send_daily_report(
@@ -294,7 +306,7 @@ async def send_daily_report(
             # 不再添加PDF附件 - 永久禁用以避免内存不足
             logger.info("PDF attachment disabled to prevent OOM errors")
 
-            response = client.send(message)
+            response = await asyncio.to_thread(client.send, message)
             logger.info(f"Daily report sent via SendGrid to {email}, status: {response.status_code}")
             return True
 
@@ -319,7 +331,7 @@ async def send_daily_report(
             logger.info("PDF attachment disabled to prevent OOM errors")
 
             send_smtp_email = sdk.SendSmtpEmail(**kwargs)
-            response = client.send_transac_email(send_smtp_email)
+            response = await asyncio.to_thread(client.send_transac_email, send_smtp_email)
             message_id = getattr(response, "message_id", None)
             logger.info(f"Daily report sent via Brevo(SDK) to {email}, message_id: {message_id}")
             return True
@@ -376,7 +388,8 @@ async def send_daily_report(
                 files["attachment"] = (pdf_filename, pdf_attachment, "application/pdf")
                 logger.info(f"Attached PDF: {pdf_filename} ({len(pdf_attachment)} bytes)")
 
-            response = requests.post(
+            response = await asyncio.to_thread(
+                requests.post,
                 f"https://api.mailgun.net/v3/{client['domain']}/messages",
                 auth=("api", client["api_key"]),
                 data=data,
@@ -460,7 +473,7 @@ async def send_weekly_report(
             # 不再添加PDF附件 - 永久禁用以避免内存不足
             logger.info("Weekly report PDF attachment disabled to prevent OOM errors")
 
-            response = client.send(message)
+            response = await asyncio.to_thread(client.send, message)
             logger.info(f"Weekly report sent via SendGrid to {email}, status: {response.status_code}")
             return True
 
@@ -485,7 +498,7 @@ async def send_weekly_report(
             logger.info("Weekly report PDF attachment disabled to prevent OOM errors")
 
             send_smtp_email = sdk.SendSmtpEmail(**kwargs)
-            response = client.send_transac_email(send_smtp_email)
+            response = await asyncio.to_thread(client.send_transac_email, send_smtp_email)
             message_id = getattr(response, "message_id", None)
             logger.info(f"Weekly report sent via Brevo(SDK) to {email}, message_id: {message_id}")
             return True
@@ -539,7 +552,8 @@ async def send_weekly_report(
             # 不再添加PDF附件 - 永久禁用以避免内存不足
             logger.info("Weekly report PDF attachment disabled to prevent OOM errors")
 
-            response = requests.post(
+            response = await asyncio.to_thread(
+                requests.post,
                 f"https://api.mailgun.net/v3/{client_dict['domain']}/messages",
                 auth=("api", client_dict["api_key"]),
                 data=data,
@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import Optional
 import requests
 import secrets
+from sqlalchemy import and_, delete, or_
+from shared.auth import hash_token
 from shared.database.database import SessionLocal
 from shared.database.models import OfficialAccount, OneTimeToken
 from shared.config import settings
@@ -186,9 +188,10 @@ def generate_relogin_token(account_id: Optional[str] = None) -> str:
     db = SessionLocal()
     try:
         one_time_token = OneTimeToken(
-            token=token,
+            token=hash_token(token),  # 库里只存摘要，原始令牌只出现在提醒邮件的链接里
             purpose="werss_relogin",
             expiry=expiry,
+            account_id=account_id,
             context={"account_id": account_id} if account_id else None
         )
         db.add(one_time_token)
@@ -205,6 +208,40 @@ def generate_relogin_token(account_id: Optional[str] = None) -> str:
         db.close()
 
 
+def purge_stale_tokens() -> int:
+    """
+    清理过期/已使用的一次性token
+
+    过期超过7天、或使用超过30天的行不再有任何用途，定期删除，
+    让 token 唯一索引保持小而常驻缓存
+
+    Returns:
+        删除的行数
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            delete(OneTimeToken).where(
+                or_(
+                    OneTimeToken.expiry < now - timedelta(days=7),
+                    and_(OneTimeToken.is_used == True, OneTimeToken.used_at < now - timedelta(days=30)),
+                )
+            )
+        )
+        db.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} stale one-time tokens")
+        return result.rowcount
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to purge one-time tokens: {e}")
+        return 0
+    finally:
+        db.close()
+
+
 def send_token_expiry_alert(expiring_accounts: list[dict]):
     """
     发送token过期提醒邮件
@@ -319,6 +356,9 @@ def monitor_tokens():
     """
     logger.info("Starting WeRSS token monitoring...")
 
+    # 顺带清理不再有用的一次性token
+    purge_stale_tokens()
+
     expiring_accounts = check_all_tokens()
 
     if expiring_accounts:
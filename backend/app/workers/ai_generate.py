@@ -27,7 +27,7 @@ sys.path.insert(0, str(project_root))
 from openai import OpenAI
 # BERTopic导入非常耗时，改为延迟导入（lazy import）
 # from bertopic import BERTopic
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from shared.config import settings
 from shared.database import (
@@ -84,7 +84,8 @@ class AIWorker:
             # 给init_db设置10秒超时
             @timeout(seconds=10)
             def _init_db_with_timeout():
-                init_db()
+                # 索引由 API 启动时在后台补齐；这里有超时中断，不做长时间的 DDL
+                init_db(build_indexes=False)
 
             _init_db_with_timeout()
         except TimeoutError as e:
@@ -202,8 +203,10 @@ class AIWorker:
             if recent_window_days < 1:
                 recent_window_days = 3
             recent_start_utc = end_utc - timedelta(days=recent_window_days)
+            # 生成器会读取每篇文章的 account.name：一次性预加载，避免逐篇懒加载
             recent_articles = (
                 db.query(Article)
+                .options(selectinload(Article.account))
                 .filter(Article.published_at >= recent_start_utc, Article.published_at < end_utc)
                 .all()
             )
@@ -220,7 +223,8 @@ class AIWorker:
             
             # 阶段1: 筛选与财政相关的内容
             finance_related_articles = self._filter_finance_related_articles(articles)
-            non_finance_articles = [a for a in articles if a not in set(finance_related_articles or [])]
+            finance_set = set(finance_related_articles or [])
+            non_finance_articles = [a for a in articles if a not in finance_set]
             
             if not finance_related_articles:
                 logger.warning(f"No finance-related articles found for {target_date}'s report")
@@ -851,20 +855,25 @@ class AIWorker:
         try:
             # 回收“卡死”的 RUNNING（例如 worker 重启/崩溃后永远不会再被处理）
             stale_minutes = int(os.getenv("REPORT_JOB_STALE_MINUTES", "60"))
-            stale_cutoff = datetime.utcnow() - timedelta(minutes=stale_minutes)
-            stale_jobs = db.query(ReportJob).filter(
+            # 单条 UPDATE 一次回收全部：不逐行加载，WHERE status=RUNNING 也保证与 API 侧回收不会重复处理
+            now = datetime.utcnow()
+            reclaimed = db.query(ReportJob).filter(
                 ReportJob.job_type == ReportJobType.REGENERATE_DAILY,
                 ReportJob.status == ReportJobStatus.RUNNING,
                 ReportJob.started_at.isnot(None),
-                ReportJob.started_at < stale_cutoff,
+                ReportJob.started_at < now - timedelta(minutes=stale_minutes),
                 ReportJob.finished_at.is_(None),
-            ).all()
-            if stale_jobs:
-                for j in stale_jobs:
-                    j.status = ReportJobStatus.FAILED
-                    j.finished_at = datetime.utcnow()
-                    j.error_message = f"Stale RUNNING reclaimed after {stale_minutes} minutes (worker restart/crash suspected)"
+            ).update(
+                {
+                    ReportJob.status: ReportJobStatus.FAILED,
+                    ReportJob.finished_at: now,
+                    ReportJob.error_message: f"Stale RUNNING reclaimed after {stale_minutes} minutes (worker restart/crash suspected)",
+                },
+                synchronize_session=False,
+            )
+            if reclaimed:
                 db.commit()
+                logger.warning(f"Reclaimed {reclaimed} stale RUNNING job(s)")
 
             # 找一个待执行任务
             query = db.query(ReportJob).filter(ReportJob.status == ReportJobStatus.PENDING).order_by(ReportJob.created_at.asc())
@@ -0,0 +1,108 @@
+"""
+Email Worker - 验证邮件发送节点
+
+职责：从 Redis 队列取出验证邮件并按令牌桶限速发送，
+避免订阅高峰时大量并发请求打到邮件服务商触发限流
+"""
+import sys
+import os
+import json
+import time
+import asyncio
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from redis.exceptions import RedisError
+
+from shared.utils import get_logger, get_redis_client
+from ..services.email_queue import VERIFY_DEAD_KEY, VERIFY_QUEUE_KEY
+from ..services.email_service import send_verification_email
+
+logger = get_logger("email-worker")
+
+# 单封邮件最多尝试次数，超过后转入死信列表
+MAX_SEND_ATTEMPTS = 3
+
+
+class TokenBucket:
+    """令牌桶：平均每秒 rate 封，允许 burst 封的突发"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        """取一个令牌；返回需要先等待的秒数（0 表示可立即发送）"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1.0
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def _requeue_failed(redis, payload: dict) -> None:
+    """发送失败：放回队尾重试，次数用尽则转入死信列表（BLPOP 已取出，不处理就会丢失）"""
+    attempts = int(payload.get("attempts") or 0) + 1
+    payload["attempts"] = attempts
+    key = VERIFY_QUEUE_KEY if attempts < MAX_SEND_ATTEMPTS else VERIFY_DEAD_KEY
+    try:
+        redis.rpush(key, json.dumps(payload))
+    except RedisError as e:
+        logger.error(f"Failed to requeue verification email for {payload.get('email')}: {e}")
+        return
+    if key == VERIFY_DEAD_KEY:
+        logger.error(f"Verification email for {payload.get('email')} failed {attempts} times, moved to {VERIFY_DEAD_KEY}")
+    else:
+        logger.warning(f"Verification email for {payload.get('email')} failed (attempt {attempts}), requeued")
+
+
+async def run():
+    """消费循环"""
+    rate = float(os.getenv("EMAIL_SEND_RATE", "2") or "2")
+    burst = int(os.getenv("EMAIL_SEND_BURST", "10") or "10")
+    bucket = TokenBucket(rate, burst)
+    redis = get_redis_client()
+
+    logger.info(f"Email worker started: queue={VERIFY_QUEUE_KEY}, rate={rate}/s, burst={burst}")
+
+    while True:
+        try:
+            # 超时需小于客户端 socket_timeout(5s)，空闲时周期性返回 None
+            item = redis.blpop(VERIFY_QUEUE_KEY, timeout=3)
+        except RedisError as e:
+            logger.error(f"Redis error while polling email queue: {e}")
+            await asyncio.sleep(5)
+            continue
+        if item is None:
+            continue
+
+        try:
+            payload = json.loads(item[1])
+            email, token = payload["email"], payload["token"]
+        except (ValueError, KeyError, TypeError):
+            logger.error(f"Dropping malformed email queue item: {item[1]!r}")
+            continue
+
+        delay = bucket.wait_time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if await send_verification_email(email=email, token=token):
+            continue
+        _requeue_failed(redis, payload)
+
+
+def main():
+    """主函数"""
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("Email worker stopped by user")
+
+
+if __name__ == "__main__":
+    main()
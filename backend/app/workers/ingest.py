@@ -18,6 +18,7 @@ import re
 import html as _html
 import os
 import sqlite3
+import threading
 from sqlalchemy.orm import Session
 
 from shared.config import settings
@@ -26,6 +27,12 @@ from shared.utils import get_logger
 
 logger = get_logger("ingestion-worker")
 
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"[ \t]+")
+_BLANK_RE = re.compile(r"\n{3,}")
+# standalone wechat image placeholders
+_PLACEHOLDER_TOKENS = frozenset({"图片", "image", "Image"})
+
 def _parse_min_article_date() -> date | None:
     """
     Minimum published date allowed for ingestion (local policy).
@@ -59,6 +66,8 @@ class IngestionWorker:
         # Throttle between fulltext requests (seconds) to reduce rate-limit / 风控
         self._fulltext_min_interval = float(os.getenv("FULLTEXT_MIN_INTERVAL", "1.5"))
         self._last_fulltext_ts: float = 0.0
+        # 多账号并发采集时，全文抓取（含 token 登录与限速）仍串行执行，避免触发风控
+        self._fulltext_lock = threading.Lock()
         self._werss_db_path = os.getenv("WERSS_DB_PATH") or ""
         self._use_werss_db = (os.getenv("USE_WERSS_DB", "True").lower() == "true")
         self._werss_db_limit = int(os.getenv("WERSS_DB_LIMIT", "400"))
@@ -241,16 +250,17 @@ class IngestionWorker:
             
             new_count = 0
             skipped_count = 0
+
+            # 检查是否已存在：整批 URL 一次查询
+            existing_by_url = self._load_existing_articles(
+                db, [getattr(entry, "link", None) for entry in feed.entries]
+            )
             
             for entry in feed.entries:
                 try:
                     # 使用URL作为唯一标识
                     article_url = entry.link
-                    
-                    # 检查是否已存在
-                    existing = db.query(Article).filter(
-                        Article.article_url == article_url
-                    ).first()
+                    existing = existing_by_url.get(article_url)
                     
                     # 提取“原文内容”（优先 RSS content:encoded，其次 description/summary）
                     # - we-mp-rss 的 RSS description 往往是摘要/短HTML
@@ -325,6 +335,7 @@ class IngestionWorker:
                     )
 
                     db.add(article)
+                    existing_by_url[article_url] = article
                     new_count += 1
                     
                 except Exception as e:
@@ -381,6 +392,7 @@ class IngestionWorker:
 
         new_count = 0
         skipped_count = 0
+        existing_by_url = self._load_existing_articles(db, [(r.get("url") or "").strip() for r in rows])
 
         for r in rows:
             try:
@@ -388,7 +400,7 @@ class IngestionWorker:
                 if not article_url:
                     continue
 
-                existing = db.query(Article).filter(Article.article_url == article_url).first()
+                existing = existing_by_url.get(article_url)
 
                 raw_content = (r.get("content") or r.get("description") or "").strip()
                 content = self._to_visible_text(raw_content)
@@ -447,6 +459,7 @@ class IngestionWorker:
                     collected_at=datetime.utcnow(),
                 )
                 db.add(article)
+                existing_by_url[article_url] = article
                 new_count += 1
             except Exception as e:
                 logger.warning(f"Failed to parse weRSS sqlite article row: {e}")
@@ -468,6 +481,20 @@ class IngestionWorker:
 
         return new_count
 
+    def _load_existing_articles(self, db: Session, urls: list) -> dict[str, Article]:
+        """
+        Load already-stored articles for a batch of URLs with chunked IN queries
+        (instead of one SELECT per entry). Newly added articles should be put into
+        the returned dict so duplicate URLs within the same batch are skipped too.
+        """
+        unique_urls = [u for u in dict.fromkeys(urls) if u]
+        existing: dict[str, Article] = {}
+        for i in range(0, len(unique_urls), 500):
+            chunk = unique_urls[i:i + 500]
+            for article in db.query(Article).filter(Article.article_url.in_(chunk)):
+                existing[article.article_url] = article
+        return existing
+
     def _fetch_werss_articles(self, feed_id: str, since_ts: int, limit: int) -> list[dict]:
         """
         Read articles from weRSS sqlite.
@@ -555,22 +582,22 @@ class IngestionWorker:
                 s = doc.text_content()
             except Exception:
                 # fallback: very rough tag removal
-                s = re.sub(r"<[^>]+>", " ", s)
+                s = _TAG_RE.sub(" ", s)
 
         # normalize whitespace
         s = s.replace("\r\n", "\n").replace("\r", "\n")
-        s = re.sub(r"[ \t]+", " ", s)
+        s = _WS_RE.sub(" ", s)
         # remove wechat "图片" placeholders when they are standalone lines
         lines = []
         for line in s.split("\n"):
             t = line.strip()
             if not t:
                 continue
-            if t in ("图片", "image", "Image"):
+            if t in _PLACEHOLDER_TOKENS:
                 continue
             lines.append(t)
         s = "\n".join(lines)
-        s = re.sub(r"\n{3,}", "\n\n", s).strip()
+        s = _BLANK_RE.sub("\n\n", s).strip()
         return s
 
     def _looks_like_werss_blocked_text(self, s: str) -> bool:
@@ -601,7 +628,7 @@ class IngestionWorker:
             return True
         if "欢迎关注" in t and len(t) < 120:
             return True
-        if t in ("图片", "image", "Image"):
+        if t in _PLACEHOLDER_TOKENS:
             return True
         # too short -> likely only title/summary
         return len(t) < 300
@@ -641,6 +668,10 @@ class IngestionWorker:
         Fetch original article full content from weRSS (Playwright+logged-in session).
         Returns visible plain text.
         """
+        with self._fulltext_lock:
+            return self._fetch_fulltext_from_werss_unlocked(article_url)
+
+    def _fetch_fulltext_from_werss_unlocked(self, article_url: str) -> str | None:
         url = f"{self.rss_bridge_url.rstrip('/')}/api/v1/wx/mps/by_article"
         token = self._get_werss_token()
         if not token:
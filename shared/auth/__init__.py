@@ -4,6 +4,8 @@
 from .security import (
     verify_password,
     get_password_hash,
+    hash_token,
+    is_well_formed_token,
     create_access_token,
     get_current_user,
     get_current_active_user,
@@ -12,6 +14,8 @@ from .security import (
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "hash_token",
+    "is_well_formed_token",
     "create_access_token",
     "get_current_user",
     "get_current_active_user",
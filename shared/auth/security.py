@@ -1,7 +1,10 @@
 """
 安全和认证工具函数
 """
+import hashlib
+import re
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
@@ -16,12 +19,26 @@ from shared.database import get_db, User
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    if isinstance(hashed_password, str):
-        hashed_password = hashed_password.encode('utf-8')
+@lru_cache(maxsize=1)
+def _dummy_hash() -> bytes:
+    """占位哈希（与真实哈希同样的 cost），首次用到时生成一次"""
+    return bcrypt.hashpw(b"z-pulse-dummy-password", bcrypt.gensalt())
+
+
+def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """
+    验证密码
+
+    hashed_password 为 None（用户不存在）时仍对占位哈希做一次完整比较并返回 False，
+    使“用户不存在”和“密码错误”耗时一致，无法据此枚举用户名
+    """
     if isinstance(plain_password, str):
         plain_password = plain_password.encode('utf-8')
+    if hashed_password is None:
+        bcrypt.checkpw(plain_password, _dummy_hash())
+        return False
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
     return bcrypt.checkpw(plain_password, hashed_password)
 
 
@@ -34,6 +51,26 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+def hash_token(token: str) -> str:
+    """
+    一次性令牌（订阅验证、WeRSS 重新登录等）入库前的 SHA-256 摘要
+
+    库里只保存摘要，原始令牌只出现在邮件/链接里；按摘要做等值查询
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+# secrets.token_urlsafe(32) 生成的令牌：固定 43 个 base64url 字符
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_-]{43}")
+
+
+def is_well_formed_token(token: str) -> bool:
+    """
+    一次性令牌格式预检：格式不对的（扫描器/手工拼接的链接）不必再查库
+    """
+    return _TOKEN_RE.fullmatch(token) is not None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     创建JWT访问令牌
@@ -81,6 +81,15 @@ class Settings(BaseSettings):
     EMAIL_FROM: str = Field(default="noreply@zpulse.com", env="EMAIL_FROM")
     EMAIL_FROM_NAME: str = Field(default="浙财脉动", env="EMAIL_FROM_NAME")
 
+    # API 服务（uvicorn）配置；WORKERS 为 0 时按 2*CPU+1 计算
+    API_WORKERS: int = Field(default=0, env="API_WORKERS")
+    API_BACKLOG: int = Field(default=2048, env="API_BACKLOG")
+    API_LIMIT_CONCURRENCY: int = Field(default=1000, env="API_LIMIT_CONCURRENCY")
+    API_TIMEOUT_KEEP_ALIVE: int = Field(default=5, env="API_TIMEOUT_KEEP_ALIVE")
+
+    # 是否注册管理后台 API（/api/admin），仅对外提供只读服务的实例可关闭
+    ENABLE_ADMIN_API: bool = Field(default=True, env="ENABLE_ADMIN_API")
+
     # 管理员配置
     ADMIN_EMAILS: List[str] = Field(
         default=["paprio@qq.com"],
@@ -6,6 +6,7 @@ from .models import (
     OfficialAccount,
     Article,
     ArticleOneLiner,
+    ArticleSummaryCache,
     Report,
     ReportJob,
     ArticleCollectionJob,
@@ -20,6 +21,7 @@ from .models import (
 from .database import (
     get_db,
     init_db,
+    ensure_compat_indexes,
     SessionLocal,
     engine,
 )
@@ -29,6 +31,7 @@ __all__ = [
     "OfficialAccount",
     "Article",
     "ArticleOneLiner",
+    "ArticleSummaryCache",
     "Report",
     "ReportJob",
     "ArticleCollectionJob",
@@ -41,6 +44,7 @@ __all__ = [
     "ArticleCollectionJobStatus",
     "get_db",
     "init_db",
+    "ensure_compat_indexes",
     "SessionLocal",
     "engine",
 ]
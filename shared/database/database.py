@@ -1,6 +1,7 @@
 """
 数据库连接和会话管理
 """
+import re
 from typing import Generator
 
 from sqlalchemy import create_engine, text, inspect
@@ -8,8 +9,11 @@ from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
 
 from ..config import settings
+from ..utils import get_logger
 from .models import Base
 
+logger = get_logger("database")
+
 
 # 创建数据库引擎
 engine = create_engine(
@@ -50,19 +54,54 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def init_db() -> None:
+def init_db(build_indexes: bool = True) -> None:
     """
     初始化数据库
     创建所有表
+
+    Args:
+        build_indexes: 是否同步补齐已有表上的索引。首次部署时三元组索引要扫描全部文章正文，
+            需要尽快就绪的服务传 False，再在后台调用 ensure_compat_indexes()
     """
     Base.metadata.create_all(bind=engine)
-    _ensure_schema_compat()
+    if _ensure_schema_compat() and build_indexes:
+        ensure_compat_indexes()
+
+
+# 需要 pg_trgm 扩展（init.sql 中已创建）。
+# 已有表上建索引一律 CONCURRENTLY：不持有 SHARE 锁，首次部署时为全部文章正文建三元组索引
+# 也不会阻塞采集写入（CONCURRENTLY 不能在事务块内执行，见 _ensure_schema_compat）
+_COMPAT_INDEX_DDL = (
+    # 管理后台文章搜索 ILIKE '%kw%'：三元组 GIN 索引
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_articles_title_trgm ON scraped_articles USING gin (title gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_articles_content_trgm ON scraped_articles USING gin (content gin_trgm_ops)",
+    # 管理后台按状态筛选 + 按发布时间排序/按天筛选
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_articles_status_published ON scraped_articles (status, published_at)",
+    # ai-worker 回收卡死的 RUNNING 任务
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_report_jobs_running_started ON report_jobs (started_at) WHERE status = 'RUNNING'",
+    # 同一类型+日期同时只允许一个进行中的任务：建唯一索引前先把历史遗留的重复进行中任务
+    # （每组只保留最新一条）标记为失败，保证索引总能建成，入队的 ON CONFLICT 去重才可靠
+    "UPDATE report_jobs SET status = 'FAILED', finished_at = COALESCE(finished_at, now() AT TIME ZONE 'UTC'), "
+    "error_message = 'Duplicate active job superseded during schema upgrade' "
+    "WHERE status IN ('PENDING', 'RUNNING') AND id NOT IN ("
+    "SELECT DISTINCT ON (job_type, target_date) id FROM report_jobs "
+    "WHERE status IN ('PENDING', 'RUNNING') ORDER BY job_type, target_date, created_at DESC, id DESC)",
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_report_jobs_single_active ON report_jobs (job_type, target_date) "
+    "WHERE status IN ('PENDING', 'RUNNING')",
+    # 与唯一索引/唯一约束重复的普通索引：只增加写入开销，查询不会用到
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_subscribers_email",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_subscribers_token",
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_one_time_tokens_token",
+)
 
 
-def _ensure_schema_compat() -> None:
+def _ensure_schema_compat() -> bool:
     """
     轻量级“开发期迁移”：
     - 项目还在开发中，不引入 Alembic，缺列则自动补齐。
+
+    Returns:
+        是否成功（失败时不再继续补索引）
     """
     try:
         inspector = inspect(engine)
@@ -75,10 +114,71 @@ def _ensure_schema_compat() -> None:
                 with engine.begin() as conn:
                     conn.execute(text("ALTER TABLE ai_generated_reports ADD COLUMN content_json JSON"))
 
+        # scraped_articles.fulltext_fetched_at
+        if "scraped_articles" in tables:
+            cols = {c["name"] for c in inspector.get_columns("scraped_articles")}
+            if "fulltext_fetched_at" not in cols:
+                with engine.begin() as conn:
+                    conn.execute(text("ALTER TABLE scraped_articles ADD COLUMN fulltext_fetched_at TIMESTAMP"))
+
+        # one_time_tokens.account_id：从 context JSON 提升为普通列，并回填旧数据
+        if "one_time_tokens" in tables:
+            cols = {c["name"] for c in inspector.get_columns("one_time_tokens")}
+            if "account_id" not in cols:
+                with engine.begin() as conn:
+                    conn.execute(text("ALTER TABLE one_time_tokens ADD COLUMN account_id VARCHAR(100)"))
+                    conn.execute(text(
+                        "UPDATE one_time_tokens SET account_id = context->>'account_id' "
+                        "WHERE context IS NOT NULL AND context->>'account_id' IS NOT NULL"
+                    ))
+
         # report_jobs 表由 create_all 创建即可；这里不额外处理
-    except Exception:
+    except Exception as e:
         # 迁移失败不应阻止服务启动（尤其是只读/测试环境）
-        return
+        logger.warning(f"Schema compat migration failed: {e}")
+        return False
+    return True
+
+
+# 同一时刻只允许一个进程补索引（API 多 worker、各服务的 init_db 会同时启动）
+_COMPAT_INDEX_LOCK_ID = 728_100_001
+_COMPAT_INDEX_NAMES = tuple(
+    m.group(1) for m in (re.search(r"IF NOT EXISTS (\w+)", ddl) for ddl in _COMPAT_INDEX_DDL) if m
+)
+
+
+def ensure_compat_indexes() -> None:
+    """
+    补齐已有表上的索引（create_all 只为新建的表建索引）
+
+    全部 CONCURRENTLY 执行，不阻塞写入，但首次构建可能耗时较长；
+    用会话级 advisory lock 保证只有一个进程执行，其余进程直接返回
+    """
+    # AUTOCOMMIT 连接：每条语句独立提交，单条失败不影响后续语句
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            if not conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _COMPAT_INDEX_LOCK_ID}).scalar():
+                logger.info("Compat index maintenance already running in another process, skipped")
+                return
+            try:
+                # 持锁时不会有别的进程在构建：INVALID 的只能是上次失败（或被中断）的构建，
+                # IF NOT EXISTS 不会重建它们，先删掉
+                invalid = conn.execute(text(
+                    "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE NOT i.indisvalid AND c.relname = ANY(:names)"
+                ), {"names": list(_COMPAT_INDEX_NAMES)}).scalars().all()
+                for name in invalid:
+                    logger.warning(f"Dropping invalid index left by a failed build: {name}")
+                    conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+                for ddl in _COMPAT_INDEX_DDL:
+                    try:
+                        conn.execute(text(ddl))
+                    except Exception as e:
+                        logger.warning(f"Schema compat DDL failed, skipped: {ddl[:80]}... err={e}")
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _COMPAT_INDEX_LOCK_ID})
+    except Exception as e:
+        logger.warning(f"Schema compat index maintenance failed: {e}")
 
 
 def drop_db() -> None:
@@ -7,7 +7,7 @@ from typing import Optional, List
 
 from sqlalchemy import (
     Boolean, Column, DateTime, Enum, ForeignKey, Integer, 
-    String, Text, JSON, Index, Date, ARRAY
+    String, Text, JSON, Index, Date, ARRAY, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -107,6 +107,7 @@ class Article(Base):
         comment="处理状态"
     )
     processed_at = Column(DateTime, comment="处理时间")
+    fulltext_fetched_at = Column(DateTime, nullable=True, comment="最近一次按需回源抓取全文的时间（成功或失败）")
     
     # AI分析结果
     summary = Column(Text, comment="AI生成的摘要")
@@ -129,6 +130,7 @@ class Article(Base):
         Index('idx_articles_publish_timestamp', 'published_at'),
         Index('idx_articles_processed_by_ai', 'status'),
         Index('idx_articles_account_published', 'account_id', 'published_at'),
+        Index('idx_articles_status_published', 'status', 'published_at'),
     )
 
 
@@ -201,6 +203,16 @@ class ReportJob(Base):
     __table_args__ = (
         Index("idx_report_jobs_status_created", "status", "created_at"),
         Index("idx_report_jobs_type_date", "job_type", "target_date"),
+        # ai-worker 每分钟回收卡死的 RUNNING 任务
+        Index("idx_report_jobs_running_started", "started_at", postgresql_where=text("status = 'RUNNING'")),
+        # 同一类型+日期同时只允许一个进行中的任务（入队用 INSERT ... ON CONFLICT DO NOTHING）
+        Index(
+            "idx_report_jobs_single_active",
+            "job_type",
+            "target_date",
+            unique=True,
+            postgresql_where=text("status IN ('PENDING', 'RUNNING')"),
+        ),
     )
 
 
@@ -274,9 +286,9 @@ class Subscriber(Base):
     activated_at = Column(DateTime, comment="激活时间")
     unsubscribed_at = Column(DateTime, comment="取消订阅时间")
     
+    # email（unique + index → 唯一索引 ix_subscribers_email）与 verification_token（唯一约束）
+    # 本身已有唯一索引，订阅/验证的等值查询直接走索引，不再额外建重复的普通索引
     __table_args__ = (
-        Index('idx_subscribers_email', 'email'),
-        Index('idx_subscribers_token', 'verification_token'),
         Index('idx_subscribers_active', 'is_active'),
     )
 
@@ -311,6 +323,25 @@ class ArticleOneLiner(Base):
     )
 
 
+class ArticleSummaryCache(Base):
+    """
+    Persistent exact-match cache for daily-briefing per-article one-sentence summaries.
+    Keyed by sha256(model | prompt_version | title | clipped text), so unchanged articles are never re-summarized.
+    """
+
+    __tablename__ = "article_summary_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False, comment="sha256(model|prompt_version|title|clip)")
+    summary = Column(Text, nullable=False)
+    model = Column(String(100), nullable=True, comment="LLM model name")
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("idx_article_summary_cache_created", "created_at"),
+    )
+
+
 class User(Base):
     """
     管理员用户表（用于后台管理）
@@ -352,14 +383,18 @@ class OneTimeToken(Base):
     used_at = Column(DateTime, comment="使用时间")
     is_used = Column(Boolean, default=False, nullable=False, comment="是否已使用")
 
+    # 关联公众号（werss_feed_id）；按 token 取出后直接与 OfficialAccount.werss_feed_id 的唯一索引连接
+    account_id = Column(String(100), nullable=True, comment="关联的WeRSS公众号ID")
+
     # 关联数据（JSON格式，存储用途相关的上下文信息）
     context = Column(JSON, nullable=True, comment="上下文信息（如公众号ID等）")
 
     # 时间戳
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # token 已有唯一索引 ix_one_time_tokens_token（unique + index），按 token 等值查询最多命中一行，
+    # purpose/is_used 只是在这一行上过滤，不需要再建复合索引
     __table_args__ = (
-        Index('idx_one_time_tokens_token', 'token'),
         Index('idx_one_time_tokens_purpose', 'purpose'),
         Index('idx_one_time_tokens_expiry', 'expiry'),
     )